@@ -0,0 +1,162 @@
+"""Benchmark certificate PDF generation.
+
+Renders certificates for students drawn from synthetic rosters with
+``CertificateGenerator.create_certificate`` and reports certificates/sec,
+p50/p99 latency, peak RSS and bytes per PDF for single-threaded, thread-pool
+and process-pool execution. Each (roster, mode) run happens in a fresh Python
+process so peak RSS is not polluted by earlier runs. Rendering is
+independent of roster size, so ``--sample`` certificates are rendered per
+roster (students spread evenly across it) unless ``--full`` is given.
+
+Usage:
+    python benchmarks/bench_certificates.py
+    python benchmarks/bench_certificates.py --students 100 10000 --sample 100 --workers 4
+    python benchmarks/bench_certificates.py --modes process --json results.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+logging.disable(logging.CRITICAL)
+
+MODES = ('single', 'thread', 'process')
+
+_generator = None
+
+
+def synthetic_student(i):
+    return {
+        'student_name': f'Student Number {i:06d}',
+        'batch_number': f'AWS-2024-{i % 500:03d}',
+        'batch_start_date': '2024-01-15',
+        'batch_end_date': '2024-04-15',
+        'sixerclass_id': f'SIX{i:06d}'
+    }
+
+
+def _init_generator(template_dir):
+    global _generator
+    logging.disable(logging.CRITICAL)
+    from certificate_generator import CertificateGenerator
+    _generator = CertificateGenerator(template_dir)
+
+
+def _render(task):
+    student, output_path = task
+    started = time.perf_counter()
+    if not _generator.create_certificate(student, output_path):
+        raise RuntimeError(f"Generation failed for {student['sixerclass_id']}")
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(output_path)
+    os.remove(output_path)
+    return elapsed, size
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_one(students, renders, mode, workers, template_dir):
+    """Render ``renders`` certificates from a roster of ``students`` in this process"""
+    step = max(1, students // renders)
+    roster = [synthetic_student(i) for i in range(students)]
+    chosen = roster[::step][:renders]
+
+    with tempfile.TemporaryDirectory(prefix='bench-certificates-') as output_dir:
+        tasks = [(student, os.path.join(output_dir, f"{student['sixerclass_id']}.pdf")) for student in chosen]
+        started = time.perf_counter()
+        if mode == 'single':
+            _init_generator(template_dir)
+            results = [_render(task) for task in tasks]
+        elif mode == 'thread':
+            _init_generator(template_dir)
+            with ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(_render, tasks))
+        else:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_generator,
+                                     initargs=(template_dir,)) as pool:
+                results = list(pool.map(_render, tasks))
+        wall = time.perf_counter() - started
+
+    latencies = [elapsed for elapsed, _ in results]
+    sizes = [size for _, size in results]
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if mode == 'process':
+        peak_rss_kb = max(peak_rss_kb, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        'students': students,
+        'mode': mode,
+        'workers': 1 if mode == 'single' else workers,
+        'renders': len(results),
+        'certificates_per_sec': round(len(results) / wall, 2),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'bytes_per_pdf': round(statistics.mean(sizes))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--sample', type=int, default=50, help='certificates rendered per roster')
+    parser.add_argument('--full', action='store_true', help='render every student in each roster')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--template-dir', default=os.path.join(BASE_DIR, 'data', 'templates'))
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--run-one', nargs=2, metavar=('STUDENTS', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        students, mode = int(args.run_one[0]), args.run_one[1]
+        renders = students if args.full else min(students, args.sample)
+        print(json.dumps(run_one(students, renders, mode, args.workers, args.template_dir)))
+        return
+
+    results = []
+    print(f"{'students':>9} {'mode':<8} {'workers':>7} {'renders':>7} {'cert/s':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'peak RSS MB':>11} {'bytes/PDF':>10}")
+    for students in args.students:
+        for mode in args.modes:
+            command = [sys.executable, os.path.abspath(__file__), '--run-one', str(students), mode,
+                       '--sample', str(args.sample), '--workers', str(args.workers),
+                       '--template-dir', args.template_dir]
+            if args.full:
+                command.append('--full')
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            results.append(row)
+            print(f"{row['students']:>9} {row['mode']:<8} {row['workers']:>7} {row['renders']:>7} "
+                  f"{row['certificates_per_sec']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8} "
+                  f"{row['peak_rss_mb']:>11} {row['bytes_per_pdf']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'sample': None if args.full else args.sample,
+                'results': results
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark JSON encoding and response compression on a large listing.
+
+Drives the real ``/api/students`` route through the Flask test client with a
+synthetic roster and reports bytes on the wire plus wall/CPU time per
+request for each JSON encoder and content-coding. Every tenth student has a
+non-ASCII name, and the decoded payloads of the encoders are compared: orjson
+writes raw UTF-8 where Flask escapes to ``\\uXXXX``, so byte counts differ but
+the decoded data must not.
+
+Usage:
+    python benchmarks/bench_json_compression.py --students 100000 --repeat 5
+    python benchmarks/bench_json_compression.py --json results.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+logging.disable(logging.CRITICAL)
+
+import app as app_module  # noqa: E402
+from compression import brotli  # noqa: E402
+from fast_json import OrjsonProvider, orjson  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+
+def synthetic_roster(count):
+    return [
+        {
+            'student_name': f'Student {i:06d}' if i % 10 else f'Zoë Śrīnivāsan {i:06d}',
+            'batch_number': f'AWS-2024-{i % 500:03d}',
+            'batch_start_date': '2024-01-15',
+            'batch_end_date': '2024-04-15',
+            'sixerclass_id': f'SIX{i:06d}'
+        }
+        for i in range(count)
+    ]
+
+
+def measure(client, accept_encoding, repeat):
+    wall, cpu, size = [], [], 0
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        response = client.get('/api/students', headers={'Accept-Encoding': accept_encoding})
+        size = len(response.get_data())
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return {
+        'bytes': size,
+        'wall_ms_median': round(statistics.median(wall) * 1000, 2),
+        'cpu_ms_median': round(statistics.median(cpu) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    flask_app = app_module.app
+    app_module.startup.wait()  # the roster loads in the background
+    app_module.students_data[:] = synthetic_roster(args.students)
+    client = flask_app.test_client()
+
+    encoders = {'flask-default': DefaultJSONProvider(flask_app)}
+    if orjson is not None:
+        encoders['orjson'] = OrjsonProvider(flask_app)
+    encodings = {'identity': 'identity', 'gzip': 'gzip'}
+    if brotli is not None:
+        encodings['br'] = 'br'
+
+    results = []
+    decoded = {}
+    for encoder_name, provider in encoders.items():
+        flask_app.json = provider
+        decoded[encoder_name] = client.get('/api/students', headers={'Accept-Encoding': 'identity'}).get_json()
+        for encoding_name, header in encodings.items():
+            row = {'encoder': encoder_name, 'encoding': encoding_name}
+            row.update(measure(client, header, args.repeat))
+            results.append(row)
+
+    baseline = results[0]
+    print(f"/api/students with {args.students} students, median of {args.repeat} requests")
+    print(f"{'encoder':<14} {'encoding':<9} {'bytes':>12} {'saved':>7} {'wall ms':>9} {'cpu ms':>9}")
+    for row in results:
+        saved = 100 * (1 - row['bytes'] / baseline['bytes'])
+        print(f"{row['encoder']:<14} {row['encoding']:<9} {row['bytes']:>12} {saved:>6.1f}% "
+              f"{row['wall_ms_median']:>9} {row['cpu_ms_median']:>9}")
+    payloads_match = all(payload == decoded['flask-default'] for payload in decoded.values())
+    print(f"decoded payloads identical across encoders: {'yes' if payloads_match else 'NO'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'students': args.students, 'repeat': args.repeat, 'payloads_match': payloads_match,
+                       'results': results}, f, indent=2)
+
+    if not payloads_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
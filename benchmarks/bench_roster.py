@@ -0,0 +1,274 @@
+"""Micro-benchmarks for roster operations at scale.
+
+Times each roster operation on synthetic rosters (1k to 1M students by
+default) for the original list-scanning code ("list") and for the
+``BatchIndex`` store ("index"), and prints one table row per
+operation/implementation with one column per roster size, so complexity
+regressions are visible at a glance. The "index" rows mirror what the
+routes do today, including any list work they still perform; "both" rows
+(exports, Excel persistence) walk the whole roster either way.
+
+Expensive full-roster operations (Excel persist/export) are skipped above
+``--persist-max`` students, and list-based imports are skipped where the
+per-row duplicate scans would exceed ``--max-scan-ops`` comparisons.
+
+Usage:
+    python benchmarks/bench_roster.py
+    python benchmarks/bench_roster.py --sizes 1000 10000 100000 --repeat 7 --json roster.json
+"""
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+logging.disable(logging.CRITICAL)
+
+import pandas as pd  # noqa: E402
+from batch_index import BatchIndex  # noqa: E402
+from exporters import iter_csv, iter_parquet, iter_xlsx, parquet_available  # noqa: E402
+
+STUDENT_COLUMNS = ['student_name', 'batch_number', 'batch_start_date', 'batch_end_date', 'sixerclass_id']
+IMPORT_ROWS = 100
+
+
+def synthetic_roster(count):
+    return [
+        {
+            'student_name': f'Student {i:07d}',
+            'batch_number': f'AWS-2024-{i % 500:03d}',
+            'batch_start_date': '2024-01-15',
+            'batch_end_date': '2024-04-15',
+            'sixerclass_id': f'SIX{i:07d}'
+        }
+        for i in range(count)
+    ]
+
+
+def measure(fn, repeat, setup=None, teardown=None):
+    """Median wall time of ``fn()`` over ``repeat`` runs"""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        fn(state) if setup else fn()
+        timings.append(time.perf_counter() - started)
+        if teardown:
+            teardown(state)
+    return statistics.median(timings)
+
+
+def consume(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def list_find(roster, name, batch, sid):
+    for s in roster:
+        if s['student_name'] == name and s['batch_number'] == batch and s['sixerclass_id'] == sid:
+            return s
+    return None
+
+
+def list_position(roster, sid):
+    for i, s in enumerate(roster):
+        if s['sixerclass_id'] == sid:
+            return i
+    return None
+
+
+def import_csv():
+    rows = ['student_name,batch_number,batch_start_date,batch_end_date,sixerclass_id']
+    rows += [f'Imported {i},AWS-2025-001,2025-01-01,2025-03-01,IMP{i:07d}' for i in range(IMPORT_ROWS)]
+    return '\n'.join(rows)
+
+
+def import_rows(csv_text):
+    """The import route's parse and vectorized cleaning step"""
+    df = pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+    df = df[STUDENT_COLUMNS].astype(str).apply(lambda column: column.str.strip())
+    return df.to_dict('records')
+
+
+def bench_size(size, repeat, persist_max, max_scan_ops, rng):
+    roster = synthetic_roster(size)
+    index = BatchIndex()
+    results = {}
+
+    def record(operation, impl, seconds):
+        results[(operation, impl)] = seconds
+
+    record('rebuild index', 'index', measure(lambda: index.rebuild(roster), 1))
+
+    targets = [roster[rng.randrange(size)] for _ in range(repeat)]
+    picks = itertools.cycle(targets)
+
+    def next_target():
+        return next(picks)
+
+    # authenticate: three-field credential check
+    record('authenticate lookup', 'list', measure(
+        lambda t: list_find(roster, t['student_name'], t['batch_number'], t['sixerclass_id']),
+        repeat, setup=next_target))
+    record('authenticate lookup', 'index', measure(
+        lambda t: (lambda s: s and s['student_name'] == t['student_name'] and s['batch_number'] == t['batch_number'])(
+            index.get_student(t['sixerclass_id'])),
+        repeat, setup=next_target))
+
+    # admin search: substring match over three fields
+    def search():
+        term = '0042'
+        return [s for s in roster if term in s['student_name'].lower() or
+                term in s['batch_number'].lower() or term in s['sixerclass_id'].lower()]
+    record('admin search', 'list', measure(search, repeat))
+
+    # batch members
+    batch = targets[0]['batch_number']
+    record('batch members', 'list', measure(lambda: [s for s in roster if s['batch_number'] == batch], repeat))
+    record('batch members', 'index', measure(lambda: index.get_batch(batch), repeat))
+
+    # add with duplicate check
+    counter = iter(range(10 ** 9))
+
+    def new_student():
+        n = next(counter)
+        return {'student_name': f'New {n}', 'batch_number': 'AWS-2024-001', 'batch_start_date': '2024-01-15',
+                'batch_end_date': '2024-04-15', 'sixerclass_id': f'NEW{n:07d}'}
+
+    def list_add(student):
+        if any(s['sixerclass_id'] == student['sixerclass_id'] for s in roster):
+            raise ValueError('duplicate')
+        roster.append(student)
+
+    def index_add(student):
+        if index.get_student(student['sixerclass_id']) is not None:
+            raise ValueError('duplicate')
+        roster.append(student)
+        index.add(student)
+
+    def undo_add(student):
+        roster.pop()
+        if index.get_student(student['sixerclass_id']) is not None:
+            index.remove(student)
+
+    record('add student', 'list', measure(list_add, repeat, setup=new_student, teardown=undo_add))
+    record('add student', 'index', measure(index_add, repeat, setup=new_student, teardown=undo_add))
+
+    # update: the route still scans for the list position, then updates the index
+    def list_update(target):
+        i = list_position(roster, target['sixerclass_id'])
+        roster[i] = dict(target)
+
+    def index_update(target):
+        i = list_position(roster, target['sixerclass_id'])
+        old = roster[i]
+        roster[i] = dict(target)
+        index.update(old, roster[i])
+
+    record('update student', 'list', measure(list_update, repeat, setup=next_target))
+    record('update student', 'index', measure(index_update, repeat, setup=next_target))
+
+    # delete: two list comprehensions, then the index removal
+    def list_delete(target):
+        removed = [s for s in roster if s['sixerclass_id'] == target['sixerclass_id']]
+        kept = [s for s in roster if s['sixerclass_id'] != target['sixerclass_id']]
+        return removed, kept
+
+    def index_delete(target):
+        removed, kept = list_delete(target)
+        for student in removed:
+            index.remove(student)
+        return removed
+
+    def restore_delete(target):
+        if index.get_student(target['sixerclass_id']) is None:
+            index.add(target)
+
+    record('delete student', 'list', measure(list_delete, repeat, setup=next_target))
+    record('delete student', 'index', measure(index_delete, repeat, setup=next_target, teardown=restore_delete))
+
+    # import: parse/clean IMPORT_ROWS rows, then duplicate checks
+    csv_text = import_csv()
+    if size * IMPORT_ROWS <= max_scan_ops:
+        record(f'import {IMPORT_ROWS} rows', 'list', measure(
+            lambda: [s for s in import_rows(csv_text)
+                     if not any(r['sixerclass_id'] == s['sixerclass_id'] for r in roster)], 1))
+    record(f'import {IMPORT_ROWS} rows', 'index', measure(
+        lambda: [s for s in import_rows(csv_text) if index.get_student(s['sixerclass_id']) is None], repeat))
+
+    # exports and persistence of the whole roster
+    def rows():
+        return ([s[c] for c in STUDENT_COLUMNS] for s in roster)
+
+    record('export csv', 'both', measure(lambda: consume(iter_csv(STUDENT_COLUMNS, rows())), 1))
+    if parquet_available():
+        record('export parquet', 'both', measure(lambda: consume(iter_parquet(STUDENT_COLUMNS, rows())), 1))
+    if size <= persist_max:
+        record('export xlsx', 'both', measure(lambda: consume(iter_xlsx(STUDENT_COLUMNS, rows())), 1))
+        buffer = io.BytesIO()
+        record('persist to excel', 'both', measure(
+            lambda: pd.DataFrame(roster).to_excel(buffer, index=False), 1, teardown=lambda _: buffer.seek(0)))
+
+    return results
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return 'skipped'
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} us'
+    if seconds < 1:
+        return f'{seconds * 1e3:.1f} ms'
+    return f'{seconds:.2f} s'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--persist-max', type=int, default=100000,
+                        help='largest roster for Excel persist/export timings')
+    parser.add_argument('--max-scan-ops', type=int, default=50_000_000,
+                        help='skip list-based imports above this many comparisons')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    by_size = {}
+    for size in args.sizes:
+        print(f"... {size} students", file=sys.stderr)
+        by_size[size] = bench_size(size, args.repeat, args.persist_max, args.max_scan_ops, rng)
+
+    keys = []
+    for results in by_size.values():
+        keys.extend(key for key in results if key not in keys)
+
+    header = f"| {'operation':<22} | {'impl':<5} | " + ' | '.join(f'{size:>10}' for size in args.sizes) + ' |'
+    print(header)
+    print('|' + '|'.join('-' * len(cell) for cell in header.split('|')[1:-1]) + '|')
+    for operation, impl in keys:
+        cells = ' | '.join(f'{format_seconds(by_size[size].get((operation, impl))):>10}' for size in args.sizes)
+        print(f"| {operation:<22} | {impl:<5} | {cells} |")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'sizes': args.sizes,
+                'repeat': args.repeat,
+                'results': [
+                    {'operation': operation, 'impl': impl, 'size': size,
+                     'seconds': by_size[size].get((operation, impl))}
+                    for operation, impl in keys for size in args.sizes
+                ]
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""End-to-end load test for the certificate app.
+
+Drives a weighted mix of realistic traffic at a fixed concurrency and reports
+throughput, latency percentiles and error rates per route:
+
+    student   POST /api/certificate (authenticate + render + PDF in one trip)
+    search    GET /admin/api/students?search=...
+    batch     GET /admin/api/batches/<batch>
+    export    GET student / report / download-status exports (csv, xlsx)
+    import    POST /admin/api/students/import with a small CSV
+
+By default the app runs in-process through the Flask test client, on a
+scratch copy of the tree (so imports and downloads never touch real data)
+with per-client rate limiting disabled. ``--url`` targets a running server
+instead; that server's own limits then apply, and the student scenario uses
+the server's real roster, read through the admin API. Imports would add
+students to that server permanently, so they are left out of the default mix
+there and need ``--allow-writes`` when asked for.
+
+Usage:
+    python benchmarks/load_test.py --students 10000 --concurrency 8 --duration 30
+    python benchmarks/load_test.py --mix student=50,export=30,search=20 --json load.json
+    python benchmarks/load_test.py --url http://localhost:5000 --admin-password secret
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'student=60,search=15,batch=5,export=15,import=5'
+EXPORT_PATHS = (
+    '/admin/api/students/export?format=csv',
+    '/admin/api/students/export?format=xlsx',
+    '/admin/api/reports/export?format=csv',
+    '/admin/api/download-status/export?format=csv',
+    '/admin/api/download-status/export?format=xlsx',
+)
+
+
+def synthetic_roster(count):
+    return [
+        {
+            'student_name': f'Student {i:06d}',
+            'batch_number': f'AWS-2024-{i % 500:03d}',
+            'batch_start_date': '2024-01-15',
+            'batch_end_date': '2024-04-15',
+            'sixerclass_id': f'SIX{i:06d}'
+        }
+        for i in range(count)
+    ]
+
+
+class TestClientTransport:
+    """Requests through the Flask test client, one cookie jar per instance"""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def request(self, method, path, json_body=None, upload=None):
+        kwargs = {}
+        if json_body is not None:
+            kwargs['json'] = json_body
+        if upload is not None:
+            filename, content = upload
+            kwargs['data'] = {'file': (io.BytesIO(content), filename)}
+            kwargs['content_type'] = 'multipart/form-data'
+        response = self.client.open(path, method=method, **kwargs)
+        body = response.get_data()
+        response.close()
+        return response.status_code, len(body)
+
+
+class HTTPTransport:
+    """Requests to a running server over HTTP, one cookie jar per instance"""
+
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, json_body=None, upload=None):
+        headers = {}
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if upload is not None:
+            filename, content = upload
+            boundary = uuid.uuid4().hex
+            data = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n'
+            ).encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+
+def fetch_roster(base_url, admin_credentials, timeout=120):
+    """Log in as admin on a running server and read its roster"""
+    transport = HTTPTransport(base_url, timeout)
+    username, password = admin_credentials
+    login = urllib.request.Request(
+        transport.base_url + '/admin/login',
+        data=json.dumps({'username': username, 'password': password}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        transport.opener.open(login, timeout=timeout).close()
+        with transport.opener.open(transport.base_url + '/admin/api/students', timeout=timeout) as response:
+            return json.loads(response.read())['students']
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"Could not read the roster from {base_url}: HTTP {e.code} {e.reason}")
+
+
+class LoadTest:
+    def __init__(self, make_transport, roster, mix, admin_credentials):
+        self.make_transport = make_transport
+        self.roster = roster
+        self.batches = sorted({s['batch_number'] for s in roster})
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.admin_credentials = admin_credentials
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)  # route -> [(status, seconds, bytes)]
+        self.import_counter = 0
+
+    def timed(self, transport, route, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            status, size = transport.request(method, path, **kwargs)
+        except Exception:
+            status, size = 0, 0
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.samples[route].append((status, elapsed, size))
+        return status
+
+    def student(self, transport, rng):
+        student = rng.choice(self.roster)
+        credentials = {k: student[k] for k in ('student_name', 'batch_number', 'sixerclass_id')}
+        self.timed(transport, 'POST /api/certificate', 'POST', '/api/certificate', json_body=credentials)
+
+    def search(self, admin, rng):
+        term = rng.choice((f'{rng.randrange(1000):03d}', rng.choice(self.batches), 'student'))
+        self.timed(admin, 'GET /admin/api/students?search', 'GET', f'/admin/api/students?search={term}')
+
+    def batch(self, admin, rng):
+        self.timed(admin, 'GET /admin/api/batches/<batch>', 'GET', f'/admin/api/batches/{rng.choice(self.batches)}')
+
+    def export(self, admin, rng):
+        path = rng.choice(EXPORT_PATHS)
+        self.timed(admin, f'GET {path}', 'GET', path)
+
+    def import_(self, admin, rng):
+        with self.lock:
+            self.import_counter += 1
+            n = self.import_counter
+        rows = ['student_name,batch_number,batch_start_date,batch_end_date,sixerclass_id']
+        rows += [f'Imported {n:05d}-{i},AWS-2025-001,2025-01-01,2025-03-01,IMP{n:05d}{i:02d}' for i in range(20)]
+        self.timed(admin, 'POST /admin/api/students/import', 'POST', '/admin/api/students/import',
+                   upload=(f'import-{n}.csv', '\n'.join(rows).encode('utf-8')))
+
+    def worker(self, seed, deadline, remaining):
+        rng = random.Random(seed)
+        student = self.make_transport()
+        admin = self.make_transport()
+        username, password = self.admin_credentials
+        status, _ = admin.request('POST', '/admin/login', json_body={'username': username, 'password': password})
+        if status != 200:
+            raise SystemExit(f"Admin login failed with HTTP {status}")
+
+        while time.monotonic() < deadline:
+            with self.lock:
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            scenario = rng.choices(self.scenarios, self.weights)[0]
+            if scenario == 'student':
+                self.student(student, rng)
+            else:
+                getattr(self, scenario)(admin, rng)
+
+    def run(self, concurrency, duration, iterations, seed):
+        deadline = time.monotonic() + duration
+        remaining = [iterations]
+        threads = [threading.Thread(target=self.worker, args=(seed + i, deadline, remaining))
+                   for i in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, wall):
+    rows = []
+    for route in sorted(samples):
+        entries = samples[route]
+        latencies = [elapsed for _, elapsed, _ in entries]
+        shed = sum(1 for status, _, _ in entries if status in (429, 503))
+        errors = sum(1 for status, _, _ in entries if status == 0 or (status >= 400 and status not in (429, 503)))
+        rows.append({
+            'route': route,
+            'requests': len(entries),
+            'rps': round(len(entries) / wall, 2),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(max(latencies) * 1000, 1),
+            'error_rate': round(errors / len(entries), 4),
+            'shed_rate': round(shed / len(entries), 4),
+            'avg_bytes': round(statistics.mean(size for _, _, size in entries))
+        })
+    return rows
+
+
+def prepare_in_process_app(students):
+    """Import the app from a scratch copy of the tree, seeded with a synthetic roster"""
+    scratch = tempfile.mkdtemp(prefix='load-test-')
+    shutil.copytree(os.path.join(BASE_DIR, 'src'), os.path.join(scratch, 'src'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copytree(os.path.join(BASE_DIR, 'assets'), os.path.join(scratch, 'assets'))
+    shutil.copytree(os.path.join(BASE_DIR, 'data', 'templates'), os.path.join(scratch, 'data', 'templates'))
+    os.environ.setdefault('RATE_LIMIT_PER_MINUTE', '0')
+    sys.path.insert(0, os.path.join(scratch, 'src'))
+
+    import app as app_module
+    app_module.startup.wait()  # seed only after the background roster load
+    if students:
+        app_module.students_data[:] = synthetic_roster(students)
+        app_module.batch_index.rebuild(app_module.students_data)
+    return app_module, scratch
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = 'import_' if name.strip() == 'import' else name.strip()
+        if name not in ('student', 'search', 'batch', 'export', 'import_'):
+            raise SystemExit(f"Unknown scenario: {name}")
+        if float(weight) > 0:
+            mix[name] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='target a running server instead of the in-process test client')
+    parser.add_argument('--students', type=int, default=10000, help='synthetic roster size (in-process only)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--iterations', type=int, help='stop after this many scenarios instead')
+    parser.add_argument('--mix', help=f'scenario weights (default {DEFAULT_MIX}, without import for --url)')
+    parser.add_argument('--allow-writes', action='store_true',
+                        help='allow the import scenario against a --url server')
+    parser.add_argument('--admin-username', default=os.environ.get('ADMIN_USERNAME', 'admin'))
+    parser.add_argument('--admin-password', default=os.environ.get('ADMIN_PASSWORD', 'admin123'))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix or DEFAULT_MIX)
+    if args.url and 'import_' in mix and not args.allow_writes:
+        if args.mix:
+            raise SystemExit("The import scenario adds students to the target server; pass --allow-writes")
+        del mix['import_']
+    scratch = None
+    logging.disable(logging.CRITICAL)
+    if args.url:
+        roster = fetch_roster(args.url, (args.admin_username, args.admin_password))
+        make_transport = lambda: HTTPTransport(args.url)  # noqa: E731
+        target = args.url
+    else:
+        app_module, scratch = prepare_in_process_app(args.students)
+        roster = list(app_module.students_data)
+        make_transport = lambda: TestClientTransport(app_module.app)  # noqa: E731
+        target = 'flask-test-client'
+    if not roster and 'student' in mix:
+        raise SystemExit(f"{target} has no students; the student scenario needs a roster")
+
+    try:
+        load = LoadTest(make_transport, roster, mix, (args.admin_username, args.admin_password))
+        wall = load.run(args.concurrency, args.iterations and float('inf') or args.duration,
+                        args.iterations, args.seed)
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    rows = summarize(load.samples, wall)
+    total = sum(row['requests'] for row in rows)
+    print(f"{target}: {total} requests in {wall:.1f}s ({total / wall:.1f} req/s), "
+          f"concurrency {args.concurrency}, {len(roster)} students")
+    print(f"{'route':<56} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'err %':>6} {'shed %':>6}")
+    for row in rows:
+        print(f"{row['route'][:56]:<56} {row['requests']:>6} {row['rps']:>7} {row['p50_ms']:>8} "
+              f"{row['p90_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8} "
+              f"{row['error_rate'] * 100:>6.1f} {row['shed_rate'] * 100:>6.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'target': target,
+                'students': len(roster),
+                'concurrency': args.concurrency,
+                'mix': {name.rstrip('_'): weight for name, weight in mix.items()},
+                'wall_seconds': round(wall, 2),
+                'total_requests': total,
+                'routes': rows
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
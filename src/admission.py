@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from tracing import span
+
+
+class GenerationOverloaded(Exception):
+    """Raised when a generation slot cannot be granted in time"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second up to ``capacity``"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take one token; return 0 on success or seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Per-client token buckets, keeping at most ``max_clients`` buckets (LRU)"""
+
+    def __init__(self, per_minute, burst, max_clients=10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def check(self, client_key):
+        """Return 0 if the client may proceed, else the seconds to wait"""
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                bucket = self._buckets[client_key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_key)
+            return bucket.take()
+
+
+class GenerationGate:
+    """Bounded concurrency plus a bounded wait queue for certificate renders.
+
+    At most ``concurrency`` renders run at once and at most ``max_queue``
+    requests wait for a slot, each for no longer than ``queue_timeout``
+    seconds. Anything beyond that is rejected immediately so workers stay
+    free for cheap routes. Background job workers pass ``bounded=False`` and
+    simply wait their turn; their number is capped by the job pool instead.
+    """
+
+    def __init__(self, concurrency, max_queue, queue_timeout):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.waiting_jobs = 0
+        self.rejected = 0
+        self._avg_seconds = 1.0  # EWMA of render time, used for Retry-After
+        self._cond = threading.Condition()
+
+    def retry_after(self):
+        """Estimated seconds until the current backlog drains"""
+        backlog = self.active + self.waiting + self.waiting_jobs
+        return max(1.0, self._avg_seconds * backlog / self.concurrency)
+
+    @contextmanager
+    def slot(self, bounded=True):
+        """Hold a render slot for the duration of the block"""
+        with span('admission.wait'), self._cond:
+            if self.active >= self.concurrency and not bounded:
+                self.waiting_jobs += 1
+                try:
+                    self._cond.wait_for(lambda: self.active < self.concurrency)
+                finally:
+                    self.waiting_jobs -= 1
+            elif self.active >= self.concurrency:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise GenerationOverloaded("Generation queue is full", self.retry_after())
+                self.waiting += 1
+                try:
+                    granted = self._cond.wait_for(lambda: self.active < self.concurrency, self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not granted:
+                    self.rejected += 1
+                    raise GenerationOverloaded("Timed out waiting for a generation slot", self.retry_after())
+            self.active += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self.active -= 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+                self._cond.notify()
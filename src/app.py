@@ -1,16 +1,55 @@
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect
-from flask_cors import CORS
-import pandas as pd
+import atexit
 import logging
+import math
 import os
+import time
+from datetime import datetime, timedelta
+
+# Created before the remaining imports so each of them is timed
+from startup import StartupReport
+startup = StartupReport()
+
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, session, redirect
+from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
-from datetime import datetime
+startup.checkpoint('import flask', 'import')
+
+# pandas, openpyxl, reportlab and PIL are imported inside the functions that
+# use them, so none of these modules pull them in at import time
 from certificate_generator import CertificateGenerator
+from batch_index import BatchIndex
+from download_log import DownloadLog
+from download_stats import DownloadStats
+from download_metrics import DownloadMetrics
+from exporters import EXPORT_FORMATS, export_response, negotiate_export_format, parquet_available
+from export_cache import ExportCache
+from page_cache import PrecompiledPage
+from asset_pipeline import AssetPipeline, IMMUTABLE_MAX_AGE
+from compression import init_compression
+from fast_json import init_json_provider
+from certificate_files import CertificateFileServer
+from admission import ClientRateLimiter, GenerationGate, GenerationOverloaded
+from single_flight import SingleFlight
+from session_store import MemorySessionStore, SQLiteSessionStore, ServerSideSessionInterface
+from generation_jobs import FINISHED_STATUSES, GenerationJobs, render_in_process
+from profiler import ProfilerBusy, SamplingProfiler
+from tracing import TraceLogFilter, Tracer, span
+from memory_report import MemoryTracker, RSSWatchdog, deep_size, type_counts
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, process_rss_bytes
+startup.checkpoint('import app modules', 'import')
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; trace_id ties log lines to exported request traces
+logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:[%(trace_id)s] %(message)s')
+for handler in logging.getLogger().handlers:
+    handler.addFilter(TraceLogFilter())
 logger = logging.getLogger(__name__)
 
+# Spawned generation processes re-import this script as __mp_main__ when the
+# server is started with `python src/app.py`. They only need render_in_process,
+# so they skip background threads, nested pools and warm-up
+WORKER_PROCESS = __name__ == '__mp_main__'
+
 app = Flask(__name__)
 
 # Environment-based configuration
@@ -27,24 +66,290 @@ app.config['CERTIFICATE_DIR'] = os.path.join(base_dir, 'data', 'certificates')
 app.config['EXCEL_DIR'] = os.path.join(base_dir, 'data', 'excel')
 app.config['UPLOAD_FOLDER'] = os.path.join(base_dir, 'data', 'uploads')
 app.config['TEMPLATE_DIR'] = os.path.join(base_dir, 'data', 'templates')
+app.config['LOG_DIR'] = os.path.join(base_dir, 'data', 'logs')
+app.config['STATIC_CACHE_DIR'] = os.path.join(base_dir, 'data', 'static')
+
+# Download log persistence
+app.config['DOWNLOAD_LOG_MAX_BYTES'] = int(os.environ.get('DOWNLOAD_LOG_MAX_BYTES', 10 * 1024 * 1024))
+app.config['DOWNLOAD_LOG_ROTATE_SECONDS'] = int(os.environ.get('DOWNLOAD_LOG_ROTATE_SECONDS', 86400))
+app.config['DOWNLOAD_LOG_FLUSH_EVENTS'] = int(os.environ.get('DOWNLOAD_LOG_FLUSH_EVENTS', 50))
+app.config['DOWNLOAD_LOG_FLUSH_SECONDS'] = float(os.environ.get('DOWNLOAD_LOG_FLUSH_SECONDS', 2.0))
+
+# Download metrics rollup retention
+app.config['METRICS_MINUTE_RETENTION_HOURS'] = int(os.environ.get('METRICS_MINUTE_RETENTION_HOURS', 48))
+app.config['METRICS_HOUR_RETENTION_DAYS'] = int(os.environ.get('METRICS_HOUR_RETENTION_DAYS', 90))
+app.config['METRICS_DAY_RETENTION_DAYS'] = int(os.environ.get('METRICS_DAY_RETENTION_DAYS', 730))
+
+# Response compression and JSON encoding
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_LEVEL'] = int(os.environ.get('COMPRESSION_LEVEL', 6))
+app.config['USE_ORJSON'] = os.environ.get('USE_ORJSON', 'true').lower() == 'true'
+
+# Certificate file serving: X-Sendfile (Apache/lighttpd) or X-Accel-Redirect (nginx)
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+app.config['CERTIFICATE_ACCEL_REDIRECT_PREFIX'] = os.environ.get('CERTIFICATE_ACCEL_REDIRECT_PREFIX', '')
+
+# Admission control for certificate generation
+app.config['GENERATION_CONCURRENCY'] = int(os.environ.get('GENERATION_CONCURRENCY', os.cpu_count() or 2))
+app.config['GENERATION_QUEUE_SIZE'] = int(os.environ.get('GENERATION_QUEUE_SIZE', 32))
+app.config['GENERATION_QUEUE_TIMEOUT'] = float(os.environ.get('GENERATION_QUEUE_TIMEOUT', 10))
+app.config['GENERATION_WORKERS'] = int(os.environ.get('GENERATION_WORKERS', app.config['GENERATION_CONCURRENCY']))
+app.config['GENERATION_WORKER_PROCESSES'] = os.environ.get('GENERATION_WORKER_PROCESSES', 'false').lower() == 'true'
+app.config['GENERATION_JOB_TTL'] = int(os.environ.get('GENERATION_JOB_TTL', 600))
+app.config['JOB_EVENTS_TIMEOUT'] = float(os.environ.get('JOB_EVENTS_TIMEOUT', 60))
+app.config['RATE_LIMIT_PER_MINUTE'] = float(os.environ.get('RATE_LIMIT_PER_MINUTE', 10))
+app.config['RATE_LIMIT_BURST'] = int(os.environ.get('RATE_LIMIT_BURST', 5))
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+app.config['TRUSTED_PROXY_HOPS'] = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+
+# Server-side sessions: 'memory' (single process) or 'sqlite' (shared by workers)
+app.config['SESSION_STORE'] = os.environ.get('SESSION_STORE', 'memory').lower()
+app.config['SESSION_DB_PATH'] = os.environ.get('SESSION_DB_PATH', os.path.join(base_dir, 'data', 'sessions.db'))
+app.config['SESSION_TTL'] = int(os.environ.get('SESSION_TTL', 3600))
+
+# Prometheus metrics; set METRICS_MULTIPROC_DIR when running several worker processes
+app.config['METRICS_MULTIPROC_DIR'] = os.environ.get('METRICS_MULTIPROC_DIR') or None
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN') or None
+
+# On-demand sampling profiler (admin only)
+app.config['PROFILE_MAX_SECONDS'] = int(os.environ.get('PROFILE_MAX_SECONDS', 60))
+
+# Request tracing: a sampled fraction plus every slow or failed request is exported
+app.config['TRACE_ENABLED'] = os.environ.get('TRACE_ENABLED', 'true').lower() == 'true'
+app.config['TRACE_SAMPLE_RATE'] = float(os.environ.get('TRACE_SAMPLE_RATE', 0.01))
+app.config['TRACE_SLOW_MS'] = float(os.environ.get('TRACE_SLOW_MS', 1000))
+app.config['TRACE_RENDER_SLOW_MS'] = float(os.environ.get('TRACE_RENDER_SLOW_MS', 5000))
+app.config['TRACE_LOG_PATH'] = os.environ.get('TRACE_LOG_PATH', os.path.join(base_dir, 'data', 'logs', 'traces.jsonl'))
+app.config['TRACE_LOG_MAX_BYTES'] = int(os.environ.get('TRACE_LOG_MAX_BYTES', 10 * 1024 * 1024))
+app.config['TRACE_LOG_BACKUPS'] = int(os.environ.get('TRACE_LOG_BACKUPS', 3))
+
+# Memory introspection and RSS watchdog (0 disables a threshold)
+app.config['MEMORY_TRACE_ON_START'] = os.environ.get('MEMORY_TRACE_ON_START', 'false').lower() == 'true'
+app.config['MEMORY_TRACE_FRAMES'] = int(os.environ.get('MEMORY_TRACE_FRAMES', 10))
+app.config['RSS_WARN_MB'] = int(os.environ.get('RSS_WARN_MB', 1024))
+app.config['RSS_LIMIT_MB'] = int(os.environ.get('RSS_LIMIT_MB', 0))
+app.config['RSS_RECYCLE'] = os.environ.get('RSS_RECYCLE', 'false').lower() == 'true'
+app.config['RSS_CHECK_SECONDS'] = int(os.environ.get('RSS_CHECK_SECONDS', 30))
+
+# Admin export cache budget
+app.config['EXPORT_CACHE_MAX_BYTES'] = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Cold start: roster loading and heavy imports run in a background warm-up;
+# requests that need them wait up to WARMUP_WAIT_SECONDS, then get a 503
+app.config['WARMUP_IN_BACKGROUND'] = os.environ.get('WARMUP_IN_BACKGROUND', 'true').lower() == 'true'
+app.config['WARMUP_WAIT_SECONDS'] = float(os.environ.get('WARMUP_WAIT_SECONDS', 10))
+app.config['WARMUP_PRELOAD'] = os.environ.get('WARMUP_PRELOAD', 'true').lower() == 'true'
 
 # Ensure directories exist
 os.makedirs(app.config['CERTIFICATE_DIR'], exist_ok=True)
 os.makedirs(app.config['EXCEL_DIR'], exist_ok=True)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['TEMPLATE_DIR'], exist_ok=True)
+os.makedirs(app.config['LOG_DIR'], exist_ok=True)
 
 CORS(app)
 
+# Take the client address from the hop our own proxies appended, never from
+# entries the client could have put in X-Forwarded-For itself
+if app.config['TRUSTED_PROXY_HOPS']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'])
+startup.checkpoint('configure app')
+
+tracer = Tracer(
+    app.config['TRACE_LOG_PATH'],
+    app.config['TRACE_SAMPLE_RATE'],
+    app.config['TRACE_SLOW_MS'],
+    app.config['TRACE_RENDER_SLOW_MS'],
+    app.config['TRACE_LOG_MAX_BYTES'],
+    app.config['TRACE_LOG_BACKUPS']
+)
+
+def incoming_trace_id():
+    """Reuse a caller-supplied 32-hex-digit X-Trace-Id, otherwise start a new trace"""
+    trace_id = request.headers.get('X-Trace-Id', '')
+    if len(trace_id) == 32 and all(ch in '0123456789abcdef' for ch in trace_id.lower()):
+        return trace_id.lower()
+    return None
+
+if app.config['TRACE_ENABLED']:
+    # Registered first, so the send span starts after every other after_request hook
+    @app.before_request
+    def start_trace():
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.trace = tracer.begin(f"{request.method} {route}", incoming_trace_id(), path=request.path)
+
+    @app.after_request
+    def trace_response(response):
+        trace = g.get('trace')
+        if trace is None:
+            return response
+        response.headers['X-Trace-Id'] = trace.trace_id
+        trace.send_span = trace.start_span('response.send', trace.root['span_id'])
+        status = response.status_code
+        if status >= 500:
+            # Routes catch their own exceptions and answer 500 themselves
+            trace.error = True
+
+        def finish():
+            trace.end_span(trace.send_span)
+            tracer.end(trace, status=status)
+
+        if response.direct_passthrough:
+            # File bodies are handed to the server (sendfile), which never
+            # calls close callbacks; the span covers the handoff only
+            trace.send_span['attributes']['offloaded'] = True
+            finish()
+        else:
+            # Runs once the server has written the body
+            response.call_on_close(finish)
+        return response
+
+    @app.teardown_request
+    def detach_trace(error=None):
+        trace = g.pop('trace', None)
+        if trace is None:
+            return
+        tracer.detach(trace)
+        if not hasattr(trace, 'send_span'):
+            # No response was produced; export the trace now
+            trace.error = trace.error or error is not None
+            tracer.end(trace, status=500)
+
+metrics = MetricsRegistry(app.config['METRICS_MULTIPROC_DIR'])
+http_requests_total = metrics.counter('http_requests_total', 'HTTP requests by route, method and status')
+http_request_duration_seconds = metrics.histogram('http_request_duration_seconds', 'HTTP request latency by route')
+certificate_render_seconds = metrics.histogram('certificate_render_seconds', 'Certificate PDF render time')
+certificate_pdf_bytes = metrics.histogram(
+    'certificate_pdf_bytes', 'Size of generated certificate PDFs',
+    buckets=(64 * 1024, 256 * 1024, 512 * 1024, 1024 * 1024, 2 * 1024 * 1024, 4 * 1024 * 1024, 8 * 1024 * 1024)
+)
+excel_persist_seconds = metrics.histogram('excel_persist_seconds', 'Time to write the roster to Excel')
+
+# Registered before compression so its after_request hook runs last and the
+# measured latency includes compression
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_request_duration_seconds.observe(time.perf_counter() - started, route=route, method=request.method)
+        http_requests_total.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+init_compression(app, min_size=app.config['COMPRESSION_MIN_SIZE'], gzip_level=app.config['COMPRESSION_LEVEL'])
+if init_json_provider(app, enabled=app.config['USE_ORJSON']):
+    logger.info("✅ Using orjson for JSON responses")
+
+# The session cookie carries only a signed session ID; data stays server side
+if app.config['SESSION_STORE'] == 'sqlite':
+    session_store = SQLiteSessionStore(app.config['SESSION_DB_PATH'])
+else:
+    session_store = MemorySessionStore()
+app.session_interface = ServerSideSessionInterface(session_store, app.config['SESSION_TTL'])
+startup.checkpoint('tracing, metrics and sessions')
+
 # Initialize certificate generator with template directory
 cert_generator = CertificateGenerator(app.config['TEMPLATE_DIR'])
 
+# Resized WebP/AVIF/PNG variants of the assets, sized for their largest
+# on-page rendering at 2x pixel density
+asset_pipeline = AssetPipeline(
+    app.config['ASSETS_DIR'],
+    app.config['STATIC_CACHE_DIR'],
+    max_edges={'bus.png': 400, 'Magicbus_logo.png': 200}
+)
+
+# Bounded render concurrency/queue and per-client token buckets
+generation_gate = GenerationGate(
+    app.config['GENERATION_CONCURRENCY'],
+    app.config['GENERATION_QUEUE_SIZE'],
+    app.config['GENERATION_QUEUE_TIMEOUT']
+)
+rate_limiter = ClientRateLimiter(app.config['RATE_LIMIT_PER_MINUTE'], app.config['RATE_LIMIT_BURST'])
+
+# Concurrent requests for the same certificate share one render
+certificate_flights = SingleFlight()
+
+# tracemalloc only runs when requested; the watchdog samples RSS periodically
+memory_tracker = MemoryTracker(app.config['MEMORY_TRACE_FRAMES'])
+if app.config['MEMORY_TRACE_ON_START'] and not WORKER_PROCESS:
+    memory_tracker.start()
+rss_watchdog = RSSWatchdog(
+    app.config['RSS_WARN_MB'] * 1024 * 1024,
+    app.config['RSS_LIMIT_MB'] * 1024 * 1024,
+    app.config['RSS_CHECK_SECONDS'],
+    app.config['RSS_RECYCLE']
+)
+if not WORKER_PROCESS:
+    rss_watchdog.start()
+
+# Idle until an admin requests a profile
+profiler = SamplingProfiler(max_duration=app.config['PROFILE_MAX_SECONDS'])
+
+# Background generation for clients that ask for a job instead of waiting
+generation_jobs = GenerationJobs(
+    app.config['GENERATION_WORKERS'],
+    app.config['GENERATION_WORKERS'] + app.config['GENERATION_QUEUE_SIZE'],
+    app.config['GENERATION_JOB_TTL'],
+    app.config['GENERATION_WORKER_PROCESSES'] and not WORKER_PROCESS
+)
+atexit.register(generation_jobs.shutdown)
+
+certificate_files = CertificateFileServer(
+    app.config['CERTIFICATE_DIR'],
+    accel_redirect_prefix=app.config['CERTIFICATE_ACCEL_REDIRECT_PREFIX'] or None
+)
+# Renders hand over the PDF's hash, so the ETag never costs a re-read of the file
+cert_generator.on_write = certificate_files.record
+
 # Global students data
 students_data = []
-download_logs = []  # Track certificate downloads
+batch_index = BatchIndex()  # batch_number -> members and batch metadata
+download_stats = DownloadStats()  # Running download counters per student
+download_metrics = DownloadMetrics(  # Per-batch minute/hour/day download rollups
+    minute_retention=timedelta(hours=app.config['METRICS_MINUTE_RETENTION_HOURS']),
+    hour_retention=timedelta(days=app.config['METRICS_HOUR_RETENTION_DAYS']),
+    day_retention=timedelta(days=app.config['METRICS_DAY_RETENTION_DAYS'])
+)
+
+export_cache = ExportCache(app.config['EXPORT_CACHE_MAX_BYTES'])  # Rendered exports by data version
+
+# Track certificate downloads in a persistent, rotating append-only log
+download_log = DownloadLog(
+    app.config['LOG_DIR'],
+    max_bytes=app.config['DOWNLOAD_LOG_MAX_BYTES'],
+    rotate_interval=app.config['DOWNLOAD_LOG_ROTATE_SECONDS'],
+    flush_events=app.config['DOWNLOAD_LOG_FLUSH_EVENTS'],
+    flush_interval=app.config['DOWNLOAD_LOG_FLUSH_SECONDS']
+)
+download_log.register(
+    'downloaded_ids',
+    lambda event: batch_index.record_download(event['sixerclass_id']),
+    snapshot=batch_index.downloaded_ids,
+    restore=batch_index.restore_downloaded
+)
+download_log.register(
+    'download_stats',
+    download_stats.record,
+    snapshot=download_stats.snapshot,
+    restore=download_stats.restore
+)
+download_log.register(
+    'download_metrics',
+    download_metrics.record,
+    snapshot=download_metrics.snapshot,
+    restore=download_metrics.restore
+)
+startup.checkpoint('init components')
 
 def create_sample_data():
     """Create sample student data"""
+    import pandas as pd
+    
     sample_data = [
         {
             'student_name': 'Rahul Sharma',
@@ -101,6 +406,8 @@ def create_sample_data():
 # Load students data
 def load_students_data():
     global students_data
+    import pandas as pd
+    
     try:
         # Use absolute path from config
         excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
@@ -108,25 +415,53 @@ def load_students_data():
         if os.path.exists(excel_path):
             df = pd.read_excel(excel_path)
             students_data = df.to_dict('records')
+            batch_index.rebuild(students_data)
             logger.info(f"✅ Loaded {len(students_data)} students from {excel_path}")
             return students_data
         
         # If no file found, create sample data
         logger.warning("❌ No Excel file found, creating sample data")
         students_data = create_sample_data()
+        batch_index.rebuild(students_data)
         return students_data
         
     except Exception as e:
         logger.error(f"❌ Error loading students data: {e}")
         students_data = create_sample_data()
+        batch_index.rebuild(students_data)
         return students_data
 
-# Load initial data
-load_students_data()
+# Rows an .xlsx sheet can hold below the header row
+EXCEL_MAX_STUDENTS = 1048576 - 1
+
+def save_students_data():
+    """Persist the roster to the Excel file, timing the write"""
+    import pandas as pd
+    
+    excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
+    with excel_persist_seconds.time():
+        pd.DataFrame(students_data).to_excel(excel_path, index=False)
+
+def replay_download_log():
+    """Rebuild download state from the log, then start the flusher"""
+    download_log.load()
+    download_log.start()
+
+def preload_modules():
+    """Import the PDF and spreadsheet libraries before the first render or export"""
+    import openpyxl  # noqa: F401
+    import reportlab.pdfgen.canvas  # noqa: F401
+
+# Load initial data during warm-up; the download log replays onto the loaded roster
+startup.defer('load roster', load_students_data)
+startup.defer('replay download log', replay_download_log)
+atexit.register(download_log.close)
 
 @app.route('/')
 def index():
-    return '''
+    return index_page.response()
+
+INDEX_HTML = '''
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -448,6 +783,54 @@ def index():
         </div>
         
         <script>
+            function waitForJob(queued) {
+                return new Promise((resolve) => {
+                    const finish = (job) => {
+                        if (job.status === 'done') {
+                            resolve(Object.assign({ success: true }, job.result));
+                        } else {
+                            resolve({ success: false, error: job.error || 'Certificate generation failed' });
+                        }
+                    };
+                    const poll = async () => {
+                        const response = await fetch(queued.status_url);
+                        const result = await response.json();
+                        if (!result.success) {
+                            resolve(result);
+                        } else if (result.job.status === 'done' || result.job.status === 'failed') {
+                            finish(result.job);
+                        } else {
+                            setTimeout(poll, 1000);
+                        }
+                    };
+                    if (!window.EventSource) {
+                        poll();
+                        return;
+                    }
+                    const events = new EventSource(queued.events_url);
+                    events.addEventListener('status', (event) => {
+                        const job = JSON.parse(event.data);
+                        if (job.status === 'done' || job.status === 'failed') {
+                            events.close();
+                            finish(job);
+                        }
+                    });
+                    events.onerror = () => {
+                        events.close();
+                        poll();
+                    };
+                });
+            }
+            
+            function triggerDownload(href, filename) {
+                const link = document.createElement('a');
+                link.href = href;
+                link.download = filename;
+                document.body.appendChild(link);
+                link.click();
+                document.body.removeChild(link);
+            }
+            
             document.getElementById('authForm').addEventListener('submit', async (e) => {
                 e.preventDefault();
                 
@@ -455,35 +838,46 @@ def index():
                 const data = Object.fromEntries(formData);
                 
                 try {
-                    const response = await fetch('/api/authenticate', {
+                    // Authenticate and receive the PDF in one round trip
+                    const response = await fetch('/api/certificate', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
                         body: JSON.stringify(data)
                     });
                     
+                    if (response.ok) {
+                        const disposition = response.headers.get('Content-Disposition') || '';
+                        const match = disposition.match(/filename="?([^";]+)"?/);
+                        const url = URL.createObjectURL(await response.blob());
+                        triggerDownload(url, match ? match[1] : 'certificate.pdf');
+                        URL.revokeObjectURL(url);
+                        alert('Certificate downloaded successfully!');
+                        return;
+                    }
+                    
                     const result = await response.json();
                     
-                    if (result.success) {
-                        // Download certificate
+                    if (response.status === 503) {
+                        // Busy: queue certificate generation and wait for the job
                         const downloadResponse = await fetch('/api/download-certificate', {
-                            method: 'POST'
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ async: true })
                         });
                         
-                        const downloadResult = await downloadResponse.json();
+                        const queued = await downloadResponse.json();
+                        const downloadResult = queued.job_id ? await waitForJob(queued) : queued;
                         
                         if (downloadResult.success) {
-                            const link = document.createElement('a');
-                            link.href = downloadResult.download_url;
-                            link.download = downloadResult.filename;
-                            document.body.appendChild(link);
-                            link.click();
-                            document.body.removeChild(link);
+                            triggerDownload(downloadResult.download_url, downloadResult.filename);
                             alert('Certificate downloaded successfully!');
                         } else {
                             alert('Certificate generation failed: ' + downloadResult.error);
                         }
-                    } else {
+                    } else if (response.status === 404 || response.status === 400) {
                         alert('Authentication failed: ' + result.error);
+                    } else {
+                        alert('Certificate generation failed: ' + result.error);
                     }
                 } catch (error) {
                     alert('Error: ' + error.message);
@@ -496,14 +890,20 @@ def index():
 
 @app.route('/static/<filename>')
 def serve_static(filename):
-    """Serve static files like logo"""
+    """Serve static files like logo, preferring optimized pipeline variants"""
     try:
-        if filename == 'Magicbus_logo.png':
-            logo_path = os.path.join(app.config['ASSETS_DIR'], 'Magicbus_logo.png')
-            return send_file(logo_path, mimetype='image/png')
-        elif filename == 'bus.png':
-            bus_path = os.path.join(app.config['ASSETS_DIR'], 'bus.png')
-            return send_file(bus_path, mimetype='image/png')
+        resolved = asset_pipeline.resolve(filename, request.headers.get('Accept', ''))
+        if resolved:
+            path, mimetype, immutable = resolved
+            response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE if immutable else 3600)
+            if immutable:
+                response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+            response.headers['Vary'] = 'Accept'
+            return response
+        
+        # Originals are still served if the pipeline could not build a variant
+        if filename in ('Magicbus_logo.png', 'bus.png'):
+            return send_file(os.path.join(app.config['ASSETS_DIR'], filename), mimetype='image/png')
         return jsonify({"error": "File not found"}), 404
     except Exception as e:
         logger.error(f"❌ Error serving static file: {e}")
@@ -511,12 +911,101 @@ def serve_static(filename):
 
 @app.route('/api/check-status')
 def check_status():
+    """Health check; 503 until the startup warm-up has loaded the roster"""
+    ready = startup.ready
     return jsonify({
-        "status": "operational",
+        "status": "operational" if ready else "starting",
+        "ready": ready,
         "students_loaded": len(students_data),
+        "startup_seconds": round(startup.ready_seconds, 3) if ready else None,
         "timestamp": datetime.now().isoformat(),
         "version": "4.0.0-Production-Ready"
-    })
+    }), 200 if ready else 503
+
+# Served before warm-up finishes: health, metrics, static files and the startup report
+WARMUP_EXEMPT_ENDPOINTS = {'check_status', 'prometheus_metrics', 'serve_static', 'admin_startup_report'}
+
+@app.before_request
+def wait_for_warmup():
+    """Hold requests until the roster is loaded, shedding with 503 after WARMUP_WAIT_SECONDS"""
+    if startup.ready or request.endpoint in WARMUP_EXEMPT_ENDPOINTS:
+        return None
+    with span('startup.wait'):
+        ready = startup.wait(app.config['WARMUP_WAIT_SECONDS'])
+    if not ready:
+        return overload_response("Service is starting up, please retry shortly", 503, 5)
+    return None
+
+# Collection-time metrics, read from the components that already track them
+metrics.callback('generation_active', 'Certificate renders in progress', 'gauge',
+                 lambda: generation_gate.active, multiprocess_mode='livesum')
+metrics.callback('generation_queue_depth', 'Requests waiting for a render slot', 'gauge',
+                 lambda: generation_gate.waiting, multiprocess_mode='livesum')
+metrics.callback('generation_rejected_total', 'Renders shed by admission control', 'counter',
+                 lambda: generation_gate.rejected)
+metrics.callback('generation_coalesced_total', 'Requests that joined an in-flight render', 'counter',
+                 lambda: certificate_flights.coalesced)
+metrics.callback('generation_jobs', 'Background generation jobs by status', 'gauge',
+                 lambda: {(('status', status),): count for status, count in generation_jobs.stats().items()},
+                 multiprocess_mode='livesum')
+metrics.callback('cache_requests_total', 'Cache lookups by cache and result', 'counter', lambda: {
+    (('cache', 'export'), ('result', 'hit')): export_cache.hits,
+    (('cache', 'export'), ('result', 'miss')): export_cache.misses,
+    (('cache', 'page'), ('result', 'hit')): sum(p.not_modified for p in (index_page, admin_login_page, admin_students_page)),
+    (('cache', 'page'), ('result', 'miss')): sum(p.served for p in (index_page, admin_login_page, admin_students_page))
+})
+metrics.callback('export_cache_bytes', 'Bytes held by the export cache', 'gauge',
+                 lambda: export_cache.stats()['bytes'])
+metrics.callback('download_log_pending_events', 'Download events buffered in memory', 'gauge',
+                 download_log.pending)
+metrics.callback('students_loaded', 'Students in the roster', 'gauge', lambda: len(students_data))
+metrics.callback('process_resident_memory_bytes', 'Resident memory of the process', 'gauge', process_rss_bytes)
+if not WORKER_PROCESS:
+    metrics.start()
+    atexit.register(metrics.close)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text-format metrics for this process (or all workers)"""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}" and not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"❌ Metrics error: {e}")
+        return jsonify({"error": "Failed to collect metrics"}), 500
+
+def find_student(student_name, batch_number, sixerclass_id):
+    """Return the student matching all three credentials, via the ID index"""
+    with span('lookup'):
+        student = batch_index.get_student(sixerclass_id)
+    if student and student['student_name'] == student_name and student['batch_number'] == batch_number:
+        return student
+    return None
+
+def certificate_path(student):
+    """Return (filename, filepath) of a student's certificate PDF"""
+    safe_name = secure_filename(student['student_name'].replace(' ', '_'))
+    filename = f"certificate_{student['sixerclass_id']}_{safe_name}.pdf"
+    return filename, os.path.join(app.config['CERTIFICATE_DIR'], filename)
+
+def login_student(student):
+    """Remember only the student's ID, under a fresh session ID"""
+    session.regenerate()
+    session['student_id'] = student['sixerclass_id']
+
+def current_student():
+    """Fresh roster record for the logged-in student, or None"""
+    sixerclass_id = session.get('student_id')
+    if sixerclass_id is None:
+        return None
+    student = batch_index.get_student(sixerclass_id)
+    if student is None:
+        # Removed from the roster since logging in
+        session.pop('student_id', None)
+        return None
+    return student
 
 @app.route('/api/authenticate', methods=['POST'])
 def authenticate():
@@ -527,16 +1016,10 @@ def authenticate():
         sixerclass_id = data.get('sixerclass_id')
 
         # Find student
-        student = None
-        for s in students_data:
-            if (s['student_name'] == student_name and 
-                s['batch_number'] == batch_number and 
-                s['sixerclass_id'] == sixerclass_id):
-                student = s
-                break
+        student = find_student(student_name, batch_number, sixerclass_id)
 
         if student:
-            session['student'] = student
+            login_student(student)
             logger.info(f"✅ Student authenticated: {student_name}")
             return jsonify({"success": True, "student": student})
         else:
@@ -547,31 +1030,115 @@ def authenticate():
         logger.error(f"❌ Authentication error: {e}")
         return jsonify({"error": "Authentication failed"}), 500
 
+def client_key():
+    """Identify the caller for per-client rate limiting (proxy-corrected by ProxyFix)"""
+    return request.remote_addr
+
+def overload_response(message, status_code, retry_after):
+    """Fast 429/503 rejection telling the client when to retry"""
+    retry_seconds = max(1, math.ceil(retry_after))
+    response = jsonify({"error": message, "retry_after": retry_seconds})
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(retry_seconds)
+    return response
+
+def generate_certificate(student, filepath, bounded=True):
+    """Render a certificate inside a generation slot, once per in-flight file"""
+    def render():
+        with generation_gate.slot(bounded), span('render', sixerclass_id=student['sixerclass_id']):
+            started = time.perf_counter()
+            success = cert_generator.create_certificate(student, filepath)
+            certificate_render_seconds.observe(time.perf_counter() - started, outcome='success' if success else 'failure')
+        if success:
+            certificate_pdf_bytes.observe(os.path.getsize(filepath))
+        return success
+    if bounded:
+        return certificate_flights.do(filepath, render)
+    while True:
+        try:
+            return certificate_flights.do(filepath, render)
+        except GenerationOverloaded:
+            # Joined a synchronous render that was shed; render again ourselves
+            continue
+
+def generate_certificate_job(student, filepath):
+    """Job-worker render: waits for a slot instead of being shed like requests"""
+    return generate_certificate(student, filepath, bounded=False)
+
+def async_requested():
+    """True when the client asked for a generation job (?async=1 or {"async": true})"""
+    if request.args.get('async', '').lower() in ('1', 'true'):
+        return True
+    data = request.get_json(silent=True)
+    return isinstance(data, dict) and bool(data.get('async'))
+
+def log_download(student, filename):
+    """Record a student certificate download"""
+    download_log.append({
+        'student_name': student['student_name'],
+        'sixerclass_id': student['sixerclass_id'],
+        'batch_number': student['batch_number'],
+        'download_time': datetime.now().isoformat(),
+        'filename': filename
+    })
+
+def enqueue_certificate(student, filepath, filename, owner, on_success=None):
+    """Queue a generation job and answer 202 with where to follow it"""
+    result = {
+        "download_url": f"/api/serve-certificate/{filename}",
+        "filename": filename,
+        "student_name": student['student_name']
+    }
+    if app.config['GENERATION_WORKER_PROCESSES']:
+        fn, args = render_in_process, (app.config['TEMPLATE_DIR'], student, filepath)
+    else:
+        fn, args = generate_certificate_job, (student, filepath)
+
+    try:
+        job = generation_jobs.submit(filepath, owner, result, fn, *args, on_success=on_success)
+    except GenerationOverloaded as e:
+        logger.warning(f"⏳ Certificate job rejected: {e}")
+        return overload_response("Certificate service is busy. Please try again shortly.", 503, e.retry_after)
+
+    logger.info(f"✅ Certificate job {job['job_id']} {job['status']}: {filename}")
+    response = jsonify({
+        "success": True,
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "status_url": f"/api/jobs/{job['job_id']}",
+        "events_url": f"/api/jobs/{job['job_id']}/events"
+    })
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job['job_id']}"
+    return response
+
 @app.route('/api/download-certificate', methods=['POST'])
 def download_certificate():
     try:
-        if 'student' not in session:
+        student = current_student()
+        if student is None:
             return jsonify({"error": "Please authenticate first"}), 401
 
-        student = session['student']
+        retry_after = rate_limiter.check(client_key())
+        if retry_after:
+            return overload_response("Too many certificate requests. Please try again shortly.", 429, retry_after)
         
         # Generate certificate
-        safe_name = secure_filename(student['student_name'].replace(' ', '_'))
-        filename = f"certificate_{student['sixerclass_id']}_{safe_name}.pdf"
-        filepath = os.path.join(app.config['CERTIFICATE_DIR'], filename)
+        filename, filepath = certificate_path(student)
+        
+        if async_requested():
+            return enqueue_certificate(student, filepath, filename, student['sixerclass_id'],
+                                       on_success=lambda: log_download(student, filename))
         
         # Create certificate
-        success = cert_generator.create_certificate(student, filepath)
+        try:
+            success = generate_certificate(student, filepath)
+        except GenerationOverloaded as e:
+            logger.warning(f"⏳ Certificate generation shed: {e}")
+            return overload_response("Certificate service is busy. Please try again shortly.", 503, e.retry_after)
         
         if success:
-            # Log the download
-            download_logs.append({
-                'student_name': student['student_name'],
-                'sixerclass_id': student['sixerclass_id'],
-                'batch_number': student['batch_number'],
-                'download_time': datetime.now().isoformat(),
-                'filename': filename
-            })
+            log_download(student, filename)
             logger.info(f"✅ Certificate generated: {filename}")
             return jsonify({
                 "success": True,
@@ -586,19 +1153,110 @@ def download_certificate():
         logger.error(f"❌ Certificate error: {e}")
         return jsonify({"error": "Certificate generation failed"}), 500
 
+def job_visible(job):
+    """Students see their own jobs, admins see all"""
+    if session.get('admin_logged_in'):
+        return True
+    return session.get('student_id') is not None and session['student_id'] in job['owners']
+
+def public_job(job):
+    return {k: v for k, v in job.items() if k != 'owners'}
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Poll a certificate generation job"""
+    job = generation_jobs.get(job_id)
+    if job is None or not job_visible(job):
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"success": True, "job": public_job(job)})
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream job status changes as Server-Sent Events until it finishes"""
+    job = generation_jobs.get(job_id)
+    if job is None or not job_visible(job):
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream(job):
+        # Bounded so a sync worker is not held forever; EventSource reconnects
+        deadline = time.monotonic() + app.config['JOB_EVENTS_TIMEOUT']
+        last_keepalive = time.monotonic()
+        yield "retry: 2000\n\n"
+        yield f"event: status\ndata: {app.json.dumps(public_job(job))}\n\n"
+        while job['status'] not in FINISHED_STATUSES and time.monotonic() < deadline:
+            seen = job['status']
+            job = generation_jobs.wait(job_id, seen, timeout=1.0)
+            if job is None:
+                return
+            if job['status'] != seen:
+                yield f"event: status\ndata: {app.json.dumps(public_job(job))}\n\n"
+            elif time.monotonic() - last_keepalive >= 15:
+                last_keepalive = time.monotonic()
+                yield ": keepalive\n\n"
+
+    response = Response(stream(job), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/certificate', methods=['POST'])
+def authenticate_and_download():
+    """Verify credentials and return the certificate PDF in a single round trip"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        student_name = data.get('student_name')
+        batch_number = data.get('batch_number')
+        sixerclass_id = data.get('sixerclass_id')
+        if not (student_name and batch_number and sixerclass_id):
+            return jsonify({"error": "student_name, batch_number and sixerclass_id are required"}), 400
+
+        retry_after = rate_limiter.check(client_key())
+        if retry_after:
+            return overload_response("Too many certificate requests. Please try again shortly.", 429, retry_after)
+
+        student = find_student(student_name, batch_number, sixerclass_id)
+        if not student:
+            logger.warning(f"❌ Authentication failed for: {student_name}")
+            return jsonify({"error": "Student not found. Please check your details."}), 404
+
+        # Keep the session so the job endpoints work if the client falls back
+        login_student(student)
+        filename, filepath = certificate_path(student)
+
+        try:
+            success = generate_certificate(student, filepath)
+        except GenerationOverloaded as e:
+            logger.warning(f"⏳ Certificate generation shed: {e}")
+            return overload_response("Certificate service is busy. Please try again shortly.", 503, e.retry_after)
+        if not success:
+            return jsonify({"error": "Certificate generation failed"}), 500
+
+        with span('serve', filename=filename):
+            response = certificate_files.response(filename)
+        if response is None:
+            return jsonify({"error": "Certificate generation failed"}), 500
+
+        log_download(student, filename)
+        logger.info(f"✅ Certificate authenticated and served: {filename}")
+        return response
+
+    except Exception as e:
+        logger.error(f"❌ Certificate error: {e}")
+        return jsonify({"error": "Certificate generation failed"}), 500
+
 @app.route('/api/serve-certificate/<filename>')
 def serve_certificate(filename):
     try:
         if not filename.startswith('certificate_') or not filename.endswith('.pdf'):
             return jsonify({"error": "Invalid filename"}), 400
             
-        filepath = os.path.join(app.config['CERTIFICATE_DIR'], filename)
-        
-        if os.path.exists(filepath):
-            logger.info(f"✅ Serving certificate: {filename}")
-            return send_file(filepath, as_attachment=True, download_name=filename)
-        else:
+        with span('serve', filename=filename):
+            response = certificate_files.response(filename)
+        if response is None:
             return jsonify({"error": "Certificate not found"}), 404
+        
+        logger.info(f"✅ Serving certificate: {filename}")
+        return response
             
     except Exception as e:
         logger.error(f"❌ File serving error: {e}")
@@ -626,12 +1284,15 @@ def admin_login():
         
         # Environment-based admin credentials
         if username == app.config['ADMIN_USERNAME'] and password == app.config['ADMIN_PASSWORD']:
+            session.regenerate()
             session['admin_logged_in'] = True
             return jsonify({"success": True})
         else:
             return jsonify({"error": "Invalid credentials"}), 401
     
-    return '''
+    return admin_login_page.response()
+
+ADMIN_LOGIN_HTML = '''
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -954,7 +1615,9 @@ def admin_students():
     if auth_check:
         return auth_check
     
-    return '''
+    return admin_students_page.response()
+
+ADMIN_STUDENTS_HTML = '''
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -1395,8 +2058,8 @@ def admin_students():
             <div class="upload-area" id="uploadArea">
                 <h3>📄 Import Students from Excel</h3>
                 <p>Drag and drop an Excel file here, or click "Import Excel" to select a file</p>
-                <p><small>Supported formats: .xlsx, .xls</small></p>
-                <input type="file" id="fileInput" accept=".xlsx,.xls" onchange="handleFileSelect(event)">
+                <p><small>Supported formats: .xlsx, .xls, .csv, .parquet</small></p>
+                <input type="file" id="fileInput" accept=".xlsx,.xls,.csv,.parquet" onchange="handleFileSelect(event)">
             </div>
             
             <div id="alertContainer"></div>
@@ -1958,6 +2621,69 @@ def admin_students():
     </html>
     '''
 
+def compile_pages():
+    """Render and compress the pages once, with asset links pointing at the
+    hashed pipeline URLs (the original /static/ names until it is built)"""
+    global index_page, admin_login_page, admin_students_page
+    index_page = PrecompiledPage(asset_pipeline.rewrite(INDEX_HTML))
+    admin_login_page = PrecompiledPage(asset_pipeline.rewrite(ADMIN_LOGIN_HTML))
+    admin_students_page = PrecompiledPage(asset_pipeline.rewrite(ADMIN_STUDENTS_HTML), cache_control='private, no-cache')
+
+def build_assets():
+    """Build the image variants (Pillow) and recompile pages to link them"""
+    asset_pipeline.build()
+    compile_pages()
+
+compile_pages()
+startup.checkpoint('compile pages')
+startup.defer('build assets', build_assets)
+if app.config['WARMUP_PRELOAD']:
+    startup.defer('preload pdf and excel modules', preload_modules)
+
+# EXPORT ROW SOURCES
+# Exports are streamed row by row, so these generators never build the
+# full table in memory. Export routes key the export cache on
+# batch_index.version (roster) and download_stats.total_downloads (log).
+STUDENT_COLUMNS = ['student_name', 'batch_number', 'batch_start_date', 'batch_end_date', 'sixerclass_id']
+REPORT_COLUMNS = ['Student Name', 'SixerClass ID', 'Batch Number', 'Download Time', 'Filename']
+DOWNLOAD_STATUS_COLUMNS = [
+    'Student Name', 'SixerClass ID', 'Batch Number', 'Batch Start Date',
+    'Batch End Date', 'Certificate Downloaded', 'Download Count', 'Last Download'
+]
+
+def student_export_rows():
+    for student in students_data:
+        yield [student.get(column) for column in STUDENT_COLUMNS]
+
+def report_export_rows():
+    for log in download_log.iter_events():
+        yield [
+            log['student_name'],
+            log['sixerclass_id'],
+            log['batch_number'],
+            log['download_time'],
+            log['filename']
+        ]
+
+def download_status_export_rows():
+    # Per-student download counts come from the incrementally maintained
+    # download_stats index, so this is a single pass over students
+    for student in students_data:
+        stats = download_stats.get(student['sixerclass_id'])
+        yield [
+            student['student_name'],
+            student['sixerclass_id'],
+            student['batch_number'],
+            student['batch_start_date'],
+            student['batch_end_date'],
+            'Yes' if stats else 'No',
+            stats['download_count'] if stats else 0,
+            stats['last_download'] if stats else 'Never'
+        ]
+
+# Upload file extensions accepted by the student import
+IMPORT_FORMATS = {'.xlsx': 'Excel', '.xls': 'Excel', '.csv': 'CSV', '.parquet': 'Parquet'}
+
 # ADMIN API ROUTES
 @app.route('/admin/api/students')
 def admin_api_students():
@@ -1988,26 +2714,67 @@ def admin_api_students():
         logger.error(f"❌ Error getting students: {e}")
         return jsonify({"error": "Failed to get students"}), 500
 
+@app.route('/admin/api/batches')
+def admin_api_batches():
+    """List all batches with size, date range and download counts"""
+    # Check authentication
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        batches = batch_index.list_batches()
+        return jsonify({
+            "success": True,
+            "total": len(batches),
+            "batches": batches
+        })
+    except Exception as e:
+        logger.error(f"❌ Error listing batches: {e}")
+        return jsonify({"error": "Failed to list batches"}), 500
+
+@app.route('/admin/api/batches/<batch_number>')
+def admin_api_batch_detail(batch_number):
+    """Get one batch with its member roster"""
+    # Check authentication
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        batch = batch_index.get_batch(batch_number)
+        if batch is None:
+            return jsonify({"error": "Batch not found"}), 404
+
+        return jsonify({
+            "success": True,
+            "batch": batch
+        })
+    except Exception as e:
+        logger.error(f"❌ Error getting batch {batch_number}: {e}")
+        return jsonify({"error": "Failed to get batch"}), 500
+
 @app.route('/admin/api/students/export')
 def admin_export_students():
-    """Export students to Excel"""
+    """Export students as XLSX (default), CSV or Parquet via ?format= or Accept"""
     # Check authentication
     if not session.get('admin_logged_in'):
         return jsonify({"error": "Unauthorized"}), 401
     
     try:
-        df = pd.DataFrame(students_data)
+        export_format = negotiate_export_format()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+        if export_format == 'parquet' and not parquet_available():
+            return jsonify({"error": "Parquet export requires pyarrow to be installed"}), 400
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"students_export_{timestamp}.xlsx"
-        filepath = os.path.join(app.config['EXCEL_DIR'], filename)
-        
-        # Export to Excel
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        basename = f"students_export_{timestamp}"
         
-        logger.info(f"✅ Students exported to: {filename}")
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        logger.info(f"✅ Students export streaming: {basename}.{export_format}")
+        return export_response(
+            STUDENT_COLUMNS, student_export_rows, basename, export_format,
+            cache=export_cache, cache_key=('students', batch_index.version)
+        )
         
     except Exception as e:
         logger.error(f"❌ Error exporting students: {e}")
@@ -2015,8 +2782,10 @@ def admin_export_students():
 
 @app.route('/admin/api/students/import', methods=['POST'])
 def admin_import_students():
-    """Import students from Excel file"""
+    """Import students from an Excel, CSV or Parquet file"""
     global students_data
+    import pandas as pd
+    
     
     # Check authentication
     if not session.get('admin_logged_in'):
@@ -2030,20 +2799,29 @@ def admin_import_students():
         if file.filename == '':
             return jsonify({"error": "No file selected"}), 400
         
-        if not file.filename.lower().endswith(('.xlsx', '.xls')):
-            return jsonify({"error": "Invalid file format. Please upload Excel file (.xlsx or .xls)"}), 400
+        extension = os.path.splitext(file.filename.lower())[1]
+        if extension not in IMPORT_FORMATS:
+            return jsonify({"error": "Invalid file format. Please upload an Excel (.xlsx, .xls), CSV (.csv) or Parquet (.parquet) file"}), 400
+        
+        if extension == '.parquet' and not parquet_available():
+            return jsonify({"error": "Parquet import requires pyarrow to be installed"}), 400
         
         # Save uploaded file
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
-        # Read Excel file - try first sheet
+        # Read the file with the reader for its format (Excel: first sheet)
         try:
-            df = pd.read_excel(filepath, sheet_name=0)
+            if extension == '.csv':
+                df = pd.read_csv(filepath, dtype=str, keep_default_na=False)
+            elif extension == '.parquet':
+                df = pd.read_parquet(filepath)
+            else:
+                df = pd.read_excel(filepath, sheet_name=0)
         except Exception as e:
-            logger.error(f"Error reading Excel: {e}")
-            return jsonify({"error": f"Cannot read Excel file: {str(e)}"}), 400
+            logger.error(f"Error reading {IMPORT_FORMATS[extension]} file: {e}")
+            return jsonify({"error": f"Cannot read {IMPORT_FORMATS[extension]} file: {str(e)}"}), 400
         
         # Validate required columns
         required_columns = ['student_name', 'batch_number', 'batch_start_date', 'batch_end_date', 'sixerclass_id']
@@ -2054,43 +2832,47 @@ def admin_import_students():
                 "error": f"Missing required columns: {', '.join(missing_columns)}"
             }), 400
         
-        # Convert to records and clean data
-        new_students = []
-        for _, row in df.iterrows():
-            try:
-                student = {
-                    'student_name': str(row['student_name']).strip(),
-                    'batch_number': str(row['batch_number']).strip(),
-                    'batch_start_date': str(row['batch_start_date']).strip(),
-                    'batch_end_date': str(row['batch_end_date']).strip(),
-                    'sixerclass_id': str(row['sixerclass_id']).strip()
-                }
-                new_students.append(student)
-            except Exception as e:
-                logger.error(f"Error processing row: {e}")
-                continue
+        # Convert to records and clean data column-wise; iterrows is far too
+        # slow for bulk imports
+        cleaned = df[required_columns].astype(str).apply(lambda column: column.str.strip())
+        new_students = cleaned.to_dict('records')
         
-        # Validate and add students
-        imported_count = 0
+        # Validate students
+        accepted = []
+        accepted_ids = set()
         errors = []
         
         for student in new_students:
-            # Check for duplicates
-            if any(s['sixerclass_id'] == student['sixerclass_id'] for s in students_data):
+            # Check for duplicates, in the roster and earlier in the file
+            if student['sixerclass_id'] in accepted_ids or batch_index.get_student(student['sixerclass_id']) is not None:
                 errors.append(f"Duplicate SixerClass ID: {student['sixerclass_id']}")
                 continue
-            
-            # Add to students_data
+            accepted.append(student)
+            accepted_ids.add(student['sixerclass_id'])
+        
+        # The roster is persisted as one Excel sheet, so refuse what it cannot hold
+        if len(students_data) + len(accepted) > EXCEL_MAX_STUDENTS:
+            return jsonify({
+                "error": f"Import would grow the roster to {len(students_data) + len(accepted)} students; "
+                         f"the Excel roster file holds at most {EXCEL_MAX_STUDENTS}"
+            }), 400
+        
+        # Add to students_data
+        for student in accepted:
             students_data.append(student)
-            imported_count += 1
+            batch_index.add(student)
+        imported_count = len(accepted)
         
-        # Save updated data to Excel
+        # Save updated data to Excel; undo the import if it cannot be persisted
         try:
-            updated_df = pd.DataFrame(students_data)
-            updated_excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
-            df.to_excel(excel_path, index=False)
+            save_students_data()
         except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            logger.error(f"❌ Error saving imported students: {e}")
+            if imported_count:
+                del students_data[-imported_count:]
+            for student in accepted:
+                batch_index.remove(student)
+            return jsonify({"error": f"Import failed: could not save the roster: {str(e)}"}), 500
         
         logger.info(f"✅ Imported {imported_count} students from {filename}")
         
@@ -2140,10 +2922,11 @@ def admin_update_student():
         # Check for duplicate SixerClass ID (if changed)
         new_id = data['sixerclass_id']
         if new_id != original_id:
-            if any(s['sixerclass_id'] == new_id for s in students_data):
+            if batch_index.get_student(new_id) is not None:
                 return jsonify({"error": f"SixerClass ID {new_id} already exists"}), 400
         
         # Update student
+        old_student = students_data[student_index]
         students_data[student_index] = {
             'student_name': data['student_name'].strip(),
             'batch_number': data['batch_number'].strip(),
@@ -2151,12 +2934,11 @@ def admin_update_student():
             'batch_end_date': data['batch_end_date'].strip(),
             'sixerclass_id': data['sixerclass_id'].strip()
         }
+        batch_index.update(old_student, students_data[student_index])
         
         # Save to Excel file
         try:
-            df = pd.DataFrame(students_data)
-            excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
-            df.to_excel(excel_path, index=False)
+            save_students_data()
         except Exception as e:
             logger.error(f"Error saving data: {e}")
         
@@ -2197,7 +2979,7 @@ def admin_add_student():
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
         # Check for duplicate SixerClass ID
-        if any(s['sixerclass_id'] == data['sixerclass_id'] for s in students_data):
+        if batch_index.get_student(data['sixerclass_id'].strip()) is not None:
             return jsonify({"error": f"SixerClass ID {data['sixerclass_id']} already exists"}), 400
         
         # Create new student
@@ -2211,12 +2993,11 @@ def admin_add_student():
         
         # Add to students_data
         students_data.append(new_student)
+        batch_index.add(new_student)
         
         # Save to Excel file
         try:
-            df = pd.DataFrame(students_data)
-            excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
-            df.to_excel(excel_path, index=False)
+            save_students_data()
         except Exception as e:
             logger.error(f"Error saving data: {e}")
         
@@ -2250,16 +3031,18 @@ def admin_delete_student():
         
         # Find and remove student
         original_count = len(students_data)
+        removed_students = [s for s in students_data if s['sixerclass_id'] == sixerclass_id]
         students_data = [s for s in students_data if s['sixerclass_id'] != sixerclass_id]
         
         if len(students_data) == original_count:
             return jsonify({"error": "Student not found"}), 404
         
+        for student in removed_students:
+            batch_index.remove(student)
+        
         # Save updated data to Excel
         try:
-            df = pd.DataFrame(students_data)
-            excel_path = os.path.join(app.config['EXCEL_DIR'], 'student-data.xlsx')
-            df.to_excel(excel_path, index=False)
+            save_students_data()
         except Exception as e:
             logger.error(f"Error saving data: {e}")
         
@@ -2289,11 +3072,15 @@ def admin_generate_certificate():
             return jsonify({"error": "Student data required"}), 400
         
         # Generate certificate
-        safe_name = secure_filename(student['student_name'].replace(' ', '_'))
-        filename = f"certificate_{student['sixerclass_id']}_{safe_name}.pdf"
-        filepath = os.path.join(app.config['CERTIFICATE_DIR'], filename)
+        filename, filepath = certificate_path(student)
         
-        success = cert_generator.create_certificate(student, filepath)
+        if async_requested():
+            return enqueue_certificate(student, filepath, filename, 'admin')
+        
+        try:
+            success = generate_certificate(student, filepath)
+        except GenerationOverloaded as e:
+            return overload_response("Certificate service is busy. Please try again shortly.", 503, e.retry_after)
         
         if success:
             logger.info(f"✅ Admin certificate generated: {filename}")
@@ -2312,75 +3099,208 @@ def admin_generate_certificate():
 
 @app.route('/admin/api/reports')
 def admin_reports():
-    """Get certificate download reports"""
+    """Get certificate download reports, optionally paged with ?page=&per_page="""
     if not session.get('admin_logged_in'):
         return jsonify({"error": "Unauthorized"}), 401
     
     try:
-        # Calculate statistics
-        total_downloads = len(download_logs)
-        unique_students = len(set(log['sixerclass_id'] for log in download_logs))
-        avg_downloads = round(total_downloads / unique_students, 1) if unique_students > 0 else 0
-        
-        # Group downloads by student
-        student_downloads = {}
-        for log in download_logs:
-            sid = log['sixerclass_id']
-            if sid not in student_downloads:
-                student_downloads[sid] = {
-                    'student_name': log['student_name'],
-                    'sixerclass_id': log['sixerclass_id'],
-                    'batch_number': log['batch_number'],
-                    'download_count': 0,
-                    'last_download': log['download_time']
-                }
-            student_downloads[sid]['download_count'] += 1
-            if log['download_time'] > student_downloads[sid]['last_download']:
-                student_downloads[sid]['last_download'] = log['download_time']
+        page = request.args.get('page', type=int)
+        per_page = request.args.get('per_page', type=int)
+        if (page is not None and page < 1) or (per_page is not None and per_page < 1):
+            return jsonify({"error": "page and per_page must be positive integers"}), 400
+        
+        # Statistics are maintained incrementally as downloads are logged
+        reports = download_stats.summary()
+        
+        if page is None and per_page is None:
+            reports['student_downloads'] = download_stats.students()
+        else:
+            page = page or 1
+            per_page = per_page or 50
+            reports['student_downloads'] = download_stats.students((page - 1) * per_page, per_page)
+            reports['page'] = page
+            reports['per_page'] = per_page
+            reports['pages'] = (reports['unique_students'] + per_page - 1) // per_page
         
         return jsonify({
             "success": True,
-            "reports": {
-                "total_downloads": total_downloads,
-                "unique_students": unique_students,
-                "avg_downloads": avg_downloads,
-                "student_downloads": list(student_downloads.values())
-            }
+            "reports": reports
         })
     except Exception as e:
         logger.error(f"❌ Error generating reports: {e}")
         return jsonify({"error": "Failed to generate reports"}), 500
 
-@app.route('/admin/api/reports/export')
-def admin_export_reports():
-    """Export certificate download reports to Excel"""
+def parse_local_timestamp(value):
+    """Parse an ISO timestamp into naive local time, like the metric bucket keys.
+
+    Offset-aware values (including a trailing Z, which Python 3.9's
+    fromisoformat rejects) are converted to local time.
+    """
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+@app.route('/admin/api/metrics/downloads')
+def admin_download_metrics():
+    """Downloads per minute/hour/day bucket, optionally for one batch"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        resolution = request.args.get('resolution', 'hour')
+        if resolution not in DownloadMetrics.RESOLUTIONS:
+            return jsonify({"error": f"resolution must be one of: {', '.join(DownloadMetrics.RESOLUTIONS)}"}), 400
+        
+        try:
+            end = parse_local_timestamp(request.args['end']) if 'end' in request.args else datetime.now()
+            start = parse_local_timestamp(request.args['start']) if 'start' in request.args else end - timedelta(days=1)
+        except ValueError:
+            return jsonify({"error": "start and end must be ISO format timestamps"}), 400
+        
+        batch_number = request.args.get('batch') or None
+        buckets = download_metrics.query(resolution, start, end, batch_number)
+        
+        return jsonify({
+            "success": True,
+            "resolution": resolution,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "batch_number": batch_number,
+            "total_downloads": sum(bucket['downloads'] for bucket in buckets),
+            "buckets": buckets
+        })
+    except Exception as e:
+        logger.error(f"❌ Error querying download metrics: {e}")
+        return jsonify({"error": "Failed to query download metrics"}), 500
+
+@app.route('/admin/api/profile')
+def admin_profile():
+    """Sample all threads for ?seconds= and return collapsed stacks for flamegraphs"""
     if not session.get('admin_logged_in'):
         return jsonify({"error": "Unauthorized"}), 401
     
     try:
-        # Prepare data for export
-        export_data = []
-        for log in download_logs:
-            export_data.append({
-                'Student Name': log['student_name'],
-                'SixerClass ID': log['sixerclass_id'],
-                'Batch Number': log['batch_number'],
-                'Download Time': log['download_time'],
-                'Filename': log['filename']
+        seconds = request.args.get('seconds', 10, type=float)
+        interval_ms = request.args.get('interval_ms', 5, type=float)
+        include_idle = request.args.get('include_idle', 'false').lower() == 'true'
+        
+        try:
+            stacks, rounds = profiler.profile(seconds, interval_ms / 1000.0, include_idle)
+        except ProfilerBusy:
+            return jsonify({"error": "A profile is already running"}), 409
+        
+        logger.info(f"✅ Profiled {rounds} sampling rounds, {sum(stacks.values())} stack samples")
+        if request.args.get('format') == 'json':
+            return jsonify({
+                "success": True,
+                "rounds": rounds,
+                "samples": sum(stacks.values()),
+                "stacks": dict(stacks.most_common())
             })
         
-        df = pd.DataFrame(export_data)
+        response = Response(profiler.collapsed(stacks), content_type='text/plain; charset=utf-8')
+        response.headers['Content-Disposition'] = f'attachment; filename=profile-{datetime.now().strftime("%Y%m%d-%H%M%S")}.folded'
+        return response
+    except Exception as e:
+        logger.error(f"❌ Profiling error: {e}")
+        return jsonify({"error": "Profiling failed"}), 500
+
+@app.route('/admin/api/memory')
+def admin_memory():
+    """Memory report: RSS, tracemalloc top allocators/diff, object types, structure sizes"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 200)
+        key_type = request.args.get('group_by', 'lineno')
+        if key_type not in ('lineno', 'filename', 'traceback'):
+            return jsonify({"error": "group_by must be one of: lineno, filename, traceback"}), 400
+        
+        structures = {
+            'students_data': {'items': len(students_data), 'bytes': deep_size(students_data)},
+            'batch_index': {'items': len(batch_index.list_batches()), 'bytes': deep_size(batch_index)},
+            'download_log': {'items': len(download_log.recent()), 'bytes': deep_size(download_log)},
+            'download_stats': {'items': download_stats.summary()['unique_students'], 'bytes': deep_size(download_stats)},
+            'download_metrics': {'bytes': deep_size(download_metrics)},
+            'export_cache': {'items': export_cache.stats()['entries'], 'bytes': export_cache.stats()['bytes']},
+            'sessions': {'items': len(session_store), 'bytes': deep_size(session_store)}
+        }
+        
+        return jsonify({
+            "success": True,
+            "pid": os.getpid(),
+            "rss_bytes": process_rss_bytes(),
+            "rss_warn_bytes": rss_watchdog.warn_bytes,
+            "rss_limit_bytes": rss_watchdog.limit_bytes,
+            "structures": structures,
+            "types": type_counts(limit),
+            "tracemalloc": memory_tracker.report(limit, key_type)
+        })
+    except Exception as e:
+        logger.error(f"❌ Memory report error: {e}")
+        return jsonify({"error": "Failed to build memory report"}), 500
+
+@app.route('/admin/api/memory/tracemalloc', methods=['POST'])
+def admin_memory_tracemalloc():
+    """Control tracemalloc: {"action": "start" | "snapshot" | "stop"}"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        action = (request.get_json(silent=True) or {}).get('action')
+        if action == 'start':
+            memory_tracker.start()
+        elif action == 'snapshot':
+            memory_tracker.mark()
+        elif action == 'stop':
+            memory_tracker.stop()
+        else:
+            return jsonify({"error": "action must be one of: start, snapshot, stop"}), 400
+        
+        logger.info(f"✅ tracemalloc {action}")
+        return jsonify({"success": True, "tracing": memory_tracker.tracing})
+    except Exception as e:
+        logger.error(f"❌ tracemalloc control error: {e}")
+        return jsonify({"error": "Failed to control tracemalloc"}), 500
+
+@app.route('/admin/api/startup')
+def admin_startup_report():
+    """Cold-start report: time spent in each import, init and warm-up step"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        return jsonify({"success": True, "pid": os.getpid(), **startup.report()})
+    except Exception as e:
+        logger.error(f"❌ Startup report error: {e}")
+        return jsonify({"error": "Failed to build startup report"}), 500
+
+@app.route('/admin/api/reports/export')
+def admin_export_reports():
+    """Export certificate download reports as XLSX (default), CSV or Parquet"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        export_format = negotiate_export_format()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+        if export_format == 'parquet' and not parquet_available():
+            return jsonify({"error": "Parquet export requires pyarrow to be installed"}), 400
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"certificate_reports_{timestamp}.xlsx"
-        filepath = os.path.join(app.config['EXCEL_DIR'], filename)
+        basename = f"certificate_reports_{timestamp}"
         
-        # Export to Excel
-        df.to_excel(filepath, index=False, engine='openpyxl')
-        
-        logger.info(f"✅ Reports exported to: {filename}")
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        logger.info(f"✅ Reports export streaming: {basename}.{export_format}")
+        return export_response(
+            REPORT_COLUMNS, report_export_rows, basename, export_format,
+            cache=export_cache, cache_key=('reports', download_stats.total_downloads)
+        )
         
     except Exception as e:
         logger.error(f"❌ Error exporting reports: {e}")
@@ -2393,51 +3313,31 @@ def admin_export_download_status():
         return jsonify({"error": "Unauthorized"}), 401
     
     try:
-        # Get students who have downloaded certificates
-        downloaded_students = set(log['sixerclass_id'] for log in download_logs)
-        
-        # Prepare data for export
-        export_data = []
-        for student in students_data:
-            has_downloaded = student['sixerclass_id'] in downloaded_students
-            download_count = sum(1 for log in download_logs if log['sixerclass_id'] == student['sixerclass_id'])
-            
-            # Get last download time if exists
-            last_download = None
-            for log in reversed(download_logs):
-                if log['sixerclass_id'] == student['sixerclass_id']:
-                    last_download = log['download_time']
-                    break
-            
-            export_data.append({
-                'Student Name': student['student_name'],
-                'SixerClass ID': student['sixerclass_id'],
-                'Batch Number': student['batch_number'],
-                'Batch Start Date': student['batch_start_date'],
-                'Batch End Date': student['batch_end_date'],
-                'Certificate Downloaded': 'Yes' if has_downloaded else 'No',
-                'Download Count': download_count,
-                'Last Download': last_download if last_download else 'Never'
-            })
-        
-        df = pd.DataFrame(export_data)
+        export_format = negotiate_export_format()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+        if export_format == 'parquet' and not parquet_available():
+            return jsonify({"error": "Parquet export requires pyarrow to be installed"}), 400
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"download_status_{timestamp}.xlsx"
-        filepath = os.path.join(app.config['EXCEL_DIR'], filename)
-        
-        # Export to Excel
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        basename = f"download_status_{timestamp}"
         
-        logger.info(f"✅ Download status exported to: {filename}")
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        logger.info(f"✅ Download status export streaming: {basename}.{export_format}")
+        return export_response(
+            DOWNLOAD_STATUS_COLUMNS, download_status_export_rows, basename, export_format,
+            cache=export_cache,
+            cache_key=('download_status', batch_index.version, download_stats.total_downloads)
+        )
         
     except Exception as e:
         logger.error(f"❌ Error exporting download status: {e}")
         return jsonify({"error": "Export failed"}), 500
 
+startup.checkpoint('register routes')
+if not WORKER_PROCESS:
+    startup.warm_up(background=app.config['WARMUP_IN_BACKGROUND'])
+
 if __name__ == '__main__':
     logger.info("🚀 Starting AWS Training Certificate System - Production Ready")
-    logger.info(f"📊 Loaded {len(students_data)} students")
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
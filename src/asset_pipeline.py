@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for assets without an explicit size
+DEFAULT_MAX_EDGE = 512
+
+# Modern formats first; PNG is the universal fallback
+FORMAT_PREFERENCE = ('image/avif', 'image/webp', 'image/png')
+FORMAT_EXTENSIONS = {'image/avif': 'avif', 'image/webp': 'webp', 'image/png': 'png'}
+ENCODER_OPTIONS = {
+    'image/avif': {'format': 'AVIF', 'quality': 60},
+    'image/webp': {'format': 'WEBP', 'quality': 85, 'method': 6},
+    'image/png': {'format': 'PNG', 'optimize': True}
+}
+# Pillow feature names whose library versions affect each format's output
+CODEC_FEATURES = {'image/avif': 'avif', 'image/webp': 'webp', 'image/png': 'zlib'}
+
+IMMUTABLE_MAX_AGE = 31536000
+
+# mkstemp creates files as 0600; variants get the mode open() would, so a
+# front-end server can read them straight from the output directory
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+
+def avif_available():
+    """AVIF needs Pillow built with libavif or the pillow-avif-plugin"""
+    from PIL import features
+
+    if 'avif' in features.modules and features.check_module('avif'):
+        return True
+    try:
+        import pillow_avif  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AssetPipeline:
+    """Resized, re-encoded and content-hashed variants of the static assets.
+
+    ``build`` runs once at startup and writes ``<name>.<hash>.<ext>`` files
+    for every format the local Pillow can encode, where the hash covers the
+    source and everything that shapes the encoded output. Pages reference the extensionless
+    ``<name>.<hash>`` URL, which is safe to cache forever; the image format
+    is negotiated per request from the ``Accept`` header.
+    """
+
+    def __init__(self, assets_dir, output_dir, max_edges=None):
+        self.assets_dir = assets_dir
+        self.output_dir = output_dir
+        self.max_edges = max_edges or {}
+        self._assets = {}   # logical name -> {'hashed': name, 'variants': {mimetype: path}}
+        self._hashed = {}   # hashed name -> logical name
+
+    def build(self):
+        """Generate variants for every image in the assets directory"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        formats = ['image/webp', 'image/png']
+        if avif_available():
+            formats.insert(0, 'image/avif')
+
+        for name in sorted(os.listdir(self.assets_dir)):
+            if not name.lower().endswith(('.png', '.jpg', '.jpeg')):
+                continue
+            try:
+                self._build_asset(name, formats)
+            except Exception as e:
+                logger.error(f"❌ Asset pipeline failed for {name}, serving original: {e}")
+
+        logger.info(f"✅ Asset pipeline built {len(self._assets)} assets into {self.output_dir}")
+
+    def _build_asset(self, name, formats):
+        import PIL
+        from PIL import Image, features
+
+        source_path = os.path.join(self.assets_dir, name)
+        max_edge = self.max_edges.get(name, DEFAULT_MAX_EDGE)
+
+        # The hash covers everything that determines the encoded bytes: the
+        # source, target size, formats, encoder settings and the Pillow and
+        # codec library versions, so an upgrade or setting change yields a
+        # new immutable URL while unchanged variants are reused across starts
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(f":{max_edge}:{PIL.__version__}".encode())
+        for mimetype in formats:
+            codec_version = features.version(CODEC_FEATURES[mimetype])
+            digest.update(f":{mimetype}:{sorted(ENCODER_OPTIONS[mimetype].items())}:{codec_version}".encode())
+        stem = os.path.splitext(name)[0]
+        hashed_name = f"{stem}.{digest.hexdigest()[:12]}"
+        variants = {}
+        image = None
+
+        for mimetype in formats:
+            path = os.path.join(self.output_dir, f"{hashed_name}.{FORMAT_EXTENSIONS[mimetype]}")
+            if not os.path.exists(path):
+                if image is None:
+                    with Image.open(source_path) as source:
+                        image = source.copy()
+                    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                # Unique temp name, so concurrent workers never share a file
+                fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix='.', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        os.fchmod(f.fileno(), FILE_MODE)
+                        image.save(f, **ENCODER_OPTIONS[mimetype])
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            variants[mimetype] = path
+
+        original_size = os.path.getsize(source_path)
+        sizes = ', '.join(f"{FORMAT_EXTENSIONS[m]} {os.path.getsize(p) // 1024} KB" for m, p in variants.items())
+        logger.info(f"✅ {name} ({original_size // 1024} KB) -> {sizes}")
+
+        self._assets[name] = {'hashed': hashed_name, 'variants': variants}
+        self._hashed[hashed_name] = name
+
+    def url_for(self, name):
+        """Hashed, immutable URL for a logical asset name"""
+        asset = self._assets.get(name)
+        return f"/static/{asset['hashed']}" if asset else f"/static/{name}"
+
+    def rewrite(self, html):
+        """Point /static/<name> references in a page at the hashed URLs"""
+        for name in self._assets:
+            html = html.replace(f"/static/{name}", self.url_for(name))
+        return html
+
+    def resolve(self, filename, accept_header):
+        """Return (path, mimetype, immutable) for a request, or None"""
+        logical = self._hashed.get(filename)
+        immutable = logical is not None
+        asset = self._assets.get(logical or filename)
+        if asset is None:
+            return None
+
+        for mimetype in FORMAT_PREFERENCE:
+            if mimetype in asset['variants'] and (mimetype == 'image/png' or mimetype in accept_header):
+                return asset['variants'][mimetype], mimetype, immutable
+        return None
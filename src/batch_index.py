@@ -0,0 +1,142 @@
+import threading
+
+
+class BatchIndex:
+    """In-memory index from batch_number to its members and batch metadata.
+
+    The index is kept in step with ``students_data`` by the CRUD and import
+    routes, so batch listings and batch details never need a roster scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batches = {}       # batch_number -> batch entry
+        self._batch_of = {}      # sixerclass_id -> batch_number
+        self._downloaded = set()  # sixerclass_ids with at least one download
+        self.version = 0          # Bumped on every roster change
+
+    def rebuild(self, students):
+        """Rebuild the whole index from a roster list"""
+        with self._lock:
+            self._batches = {}
+            self._batch_of = {}
+            for student in students:
+                self._add(student)
+            self.version += 1
+
+    def add(self, student):
+        """Add a student to its batch"""
+        with self._lock:
+            self._add(student)
+            self.version += 1
+
+    def remove(self, student):
+        """Remove a student from its batch"""
+        with self._lock:
+            self._remove(student['sixerclass_id'])
+            self.version += 1
+
+    def update(self, old_student, new_student):
+        """Move a student record, handling batch and ID changes"""
+        with self._lock:
+            self._remove(old_student['sixerclass_id'])
+            self._add(new_student)
+            self.version += 1
+
+    def record_download(self, sixerclass_id):
+        """Mark a student as having downloaded their certificate"""
+        with self._lock:
+            if sixerclass_id in self._downloaded:
+                return
+            self._downloaded.add(sixerclass_id)
+            batch_number = self._batch_of.get(sixerclass_id)
+            if batch_number is not None:
+                self._batches[batch_number]['downloaded'].add(sixerclass_id)
+
+    def downloaded_ids(self):
+        """Return the IDs of all students that have downloaded"""
+        with self._lock:
+            return sorted(self._downloaded)
+
+    def restore_downloaded(self, sixerclass_ids):
+        """Restore download markers, e.g. from a download log checkpoint"""
+        for sid in sixerclass_ids:
+            self.record_download(sid)
+
+    def get_student(self, sixerclass_id):
+        """Look up a student record by SixerClass ID"""
+        with self._lock:
+            batch_number = self._batch_of.get(sixerclass_id)
+            if batch_number is None:
+                return None
+            return self._batches[batch_number]['members'].get(sixerclass_id)
+
+    def list_batches(self):
+        """Return summaries for every batch, ordered by batch number"""
+        with self._lock:
+            return [self._summary(number, self._batches[number]) for number in sorted(self._batches)]
+
+    def get_batch(self, batch_number):
+        """Return the summary and member list for one batch, or None"""
+        with self._lock:
+            entry = self._batches.get(batch_number)
+            if entry is None:
+                return None
+            batch = self._summary(batch_number, entry)
+            batch['students'] = [
+                dict(student, certificate_downloaded=sid in entry['downloaded'])
+                for sid, student in entry['members'].items()
+            ]
+            return batch
+
+    def _add(self, student):
+        sid = student['sixerclass_id']
+        if sid in self._batch_of:
+            self._remove(sid)
+
+        batch_number = student['batch_number']
+        entry = self._batches.get(batch_number)
+        if entry is None:
+            entry = {'members': {}, 'downloaded': set(), 'start': None, 'end': None}
+            self._batches[batch_number] = entry
+
+        entry['members'][sid] = student
+        self._batch_of[sid] = batch_number
+        if sid in self._downloaded:
+            entry['downloaded'].add(sid)
+
+        start = str(student['batch_start_date'])
+        end = str(student['batch_end_date'])
+        if entry['start'] is None or start < entry['start']:
+            entry['start'] = start
+        if entry['end'] is None or end > entry['end']:
+            entry['end'] = end
+
+    def _remove(self, sid):
+        batch_number = self._batch_of.pop(sid, None)
+        if batch_number is None:
+            return
+
+        entry = self._batches[batch_number]
+        student = entry['members'].pop(sid)
+        entry['downloaded'].discard(sid)
+
+        if not entry['members']:
+            del self._batches[batch_number]
+            return
+
+        # Only rescan the batch when the removed student defined a boundary date
+        if str(student['batch_start_date']) == entry['start']:
+            entry['start'] = min(str(s['batch_start_date']) for s in entry['members'].values())
+        if str(student['batch_end_date']) == entry['end']:
+            entry['end'] = max(str(s['batch_end_date']) for s in entry['members'].values())
+
+    @staticmethod
+    def _summary(batch_number, entry):
+        return {
+            'batch_number': batch_number,
+            'batch_start_date': entry['start'],
+            'batch_end_date': entry['end'],
+            'student_count': len(entry['members']),
+            'downloaded_count': len(entry['downloaded'])
+        }
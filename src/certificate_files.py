@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+
+from flask import Response, send_file
+from werkzeug.utils import safe_join
+
+
+class CertificateFileServer:
+    """Serves generated certificate PDFs without pushing bytes through Python.
+
+    With ``accel_redirect_prefix`` set, the response is an empty
+    ``X-Accel-Redirect`` handoff for nginx to serve from an internal
+    location. Otherwise ``send_file`` is used, which honours ``USE_X_SENDFILE``
+    and hands the open file to the server's ``wsgi.file_wrapper`` (sendfile
+    under gunicorn), with Range, If-Modified-Since and a content-hash ETag.
+    """
+
+    def __init__(self, directory, accel_redirect_prefix=None):
+        self.directory = directory
+        self.accel_redirect_prefix = accel_redirect_prefix
+        self._lock = threading.Lock()
+        self._hashes = {}  # path -> (mtime_ns, size, sha256)
+
+    def record(self, path, stat, content_hash):
+        """Remember the hash of a file just written, so serving it never re-reads it"""
+        with self._lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+
+    def content_hash(self, path, stat):
+        """SHA-256 of the file, cached until its mtime or size changes"""
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(256 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    def response(self, filename):
+        """Response serving ``filename``, or None when it does not exist"""
+        path = safe_join(self.directory, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        if self.accel_redirect_prefix:
+            response = Response(mimetype='application/pdf')
+            response.headers['X-Accel-Redirect'] = f"{self.accel_redirect_prefix.rstrip('/')}/{filename}"
+            response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+            return response
+
+        try:
+            response = send_file(
+                path,
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=filename,
+                conditional=True,
+                etag=self.content_hash(path, stat),
+                last_modified=stat.st_mtime
+            )
+        except FileNotFoundError:
+            return None
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
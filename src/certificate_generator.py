@@ -1,11 +1,24 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+import hashlib
+import io
+import logging
 import os
+import tempfile
 from datetime import datetime
-from PIL import Image
+from tracing import record_error, span
+
+logger = logging.getLogger(__name__)
+
+# mkstemp creates files as 0600; give finished PDFs the mode open() would,
+# so a front-end server reading them via X-Accel-Redirect/X-Sendfile can
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
 
 class CertificateGenerator:
-    def __init__(self, template_dir=None):
+    def __init__(self, template_dir=None, on_write=None):
+        # Called as on_write(path, stat, sha256) after each PDF is written
+        self.on_write = on_write
+        
         # Use provided template directory or try to find it
         if template_dir:
             self.template_path = os.path.join(template_dir, 'certificate-template.png')
@@ -26,9 +39,9 @@ class CertificateGenerator:
                     break
         
         if not self.template_path or not os.path.exists(self.template_path):
-            print("❌ Certificate template not found!")
+            logger.error("❌ Certificate template not found!")
         else:
-            print(f"✅ Using template: {self.template_path}")
+            logger.info(f"✅ Using template: {self.template_path}")
     
     def format_date(self, date_str):
         """Convert date to dd-mm-yyyy format"""
@@ -43,6 +56,8 @@ class CertificateGenerator:
         
     def get_image_dimensions(self):
         """Get original image dimensions"""
+        from PIL import Image
+        
         if self.template_path and os.path.exists(self.template_path):
             with Image.open(self.template_path) as img:
                 return img.size  # (width, height)
@@ -50,58 +65,85 @@ class CertificateGenerator:
         
     def create_certificate(self, student_data, output_path):
         """Create PDF certificate with template overlay"""
+        # reportlab is imported on first render so importing the app stays fast
+        from reportlab.pdfgen import canvas
+        
+        tmp_path = None
         try:
             if not self.template_path:
-                print("❌ No template available")
+                logger.error("❌ No template available")
+                record_error("No template available")
                 return False
                 
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Get image dimensions
-            img_width, img_height = self.get_image_dimensions()
-            
-            # Create PDF with exact image dimensions
-            custom_page_size = (img_width, img_height)
-            c = canvas.Canvas(output_path, pagesize=custom_page_size)
-            
-            # Draw template image at exact size
-            c.drawImage(self.template_path, 0, 0, width=img_width, height=img_height)
-            
-            # Dynamic center alignment for student name
-            name_font_size = 32
-            c.setFont("Helvetica-Bold", name_font_size)
-            c.setFillColorRGB(0, 0, 0)  # Black text
-            
-            # Define name area boundaries (matching your underlined space)
-            name_start_x = 269   # Left boundary of underlined space
-            name_end_x = 1280    # Right boundary of underlined space
-            name_y = 600         # Y position
+            # Get image dimensions and draw the template image at exact size
+            with span('template.load', template=self.template_path):
+                img_width, img_height = self.get_image_dimensions()
+                
+                # Create PDF with exact image dimensions, rendered in memory
+                custom_page_size = (img_width, img_height)
+                buffer = io.BytesIO()
+                c = canvas.Canvas(buffer, pagesize=custom_page_size)
+                c.drawImage(self.template_path, 0, 0, width=img_width, height=img_height)
             
-            # Calculate center position for name
-            name_text = student_data['student_name'].upper()
-            name_width = c.stringWidth(name_text, "Helvetica-Bold", name_font_size)
-            name_center_x = name_start_x + (name_end_x - name_start_x - name_width) / 2
+            with span('canvas.draw'):
+                # Dynamic center alignment for student name
+                name_font_size = 32
+                c.setFont("Helvetica-Bold", name_font_size)
+                c.setFillColorRGB(0, 0, 0)  # Black text
+                
+                # Define name area boundaries (matching your underlined space)
+                name_start_x = 269   # Left boundary of underlined space
+                name_end_x = 1280    # Right boundary of underlined space
+                name_y = 600         # Y position
+                
+                # Calculate center position for name
+                name_text = student_data['student_name'].upper()
+                name_width = c.stringWidth(name_text, "Helvetica-Bold", name_font_size)
+                name_center_x = name_start_x + (name_end_x - name_start_x - name_width) / 2
+                
+                # Draw centered name
+                c.drawString(name_center_x, name_y, name_text)
+                
+                # Dates at perfect positions with dd-mm-yyyy format
+                c.setFont("Helvetica", 26)
+                start_date = self.format_date(student_data['batch_start_date'])
+                end_date = self.format_date(student_data['batch_end_date'])
+                c.drawString(565, 418, start_date)
+                c.drawString(965, 418, end_date)
+                
+                # Additional info
+                c.setFont("Helvetica", 12)
+                c.drawString(50, 50, f"Batch: {student_data['batch_number']}")
+                c.drawString(50, 35, f"ID: {student_data['sixerclass_id']}")
+                c.drawString(400, 35, f"Issued: {datetime.now().strftime('%d-%m-%Y')}")
             
-            # Draw centered name
-            c.drawString(name_center_x, name_y, name_text)
+            with span('pdf.save'):
+                c.save()
             
-            # Dates at perfect positions with dd-mm-yyyy format
-            c.setFont("Helvetica", 26)
-            start_date = self.format_date(student_data['batch_start_date'])
-            end_date = self.format_date(student_data['batch_end_date'])
-            c.drawString(565, 418, start_date)
-            c.drawString(965, 418, end_date)
+            # Write to a temp file in the same directory and rename it into
+            # place, so readers never see a partially written PDF
+            with span('disk.write', bytes=buffer.getbuffer().nbytes):
+                output_dir = os.path.dirname(output_path)
+                os.makedirs(output_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.', suffix='.pdf.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    os.fchmod(f.fileno(), FILE_MODE)
+                    f.write(buffer.getbuffer())
+                    f.flush()
+                    stat = os.fstat(f.fileno())
+                os.replace(tmp_path, output_path)
+                tmp_path = None
             
-            # Additional info
-            c.setFont("Helvetica", 12)
-            c.drawString(50, 50, f"Batch: {student_data['batch_number']}")
-            c.drawString(50, 35, f"ID: {student_data['sixerclass_id']}")
-            c.drawString(400, 35, f"Issued: {datetime.now().strftime('%d-%m-%Y')}")
+            if self.on_write:
+                self.on_write(output_path, stat, hashlib.sha256(buffer.getbuffer()).hexdigest())
             
-            c.save()
-            print(f"✅ Template-based certificate created: {output_path}")
+            logger.info(f"✅ Template-based certificate created: {output_path}")
             return True
             
         except Exception as e:
-            print(f"❌ Certificate generation error: {e}")
-            return False
\ No newline at end of file
+            logger.error(f"❌ Certificate generation error: {e}")
+            record_error(e)
+            return False
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
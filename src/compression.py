@@ -0,0 +1,60 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/plain'}
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def encoded_etags(etag):
+    """``etag`` plus the per-coding variants ``compress_response`` gives it"""
+    return [etag] + [f"{etag}-{encoding}" for encoding in CONTENT_CODINGS]
+
+
+def init_compression(app, min_size=1024, gzip_level=6, brotli_quality=5):
+    """Compress eligible responses according to Accept-Encoding.
+
+    Only buffered responses of a compressible type and at least ``min_size``
+    bytes are touched; streamed, already-encoded and small responses pass
+    through unchanged.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or
+                response.direct_passthrough or
+                response.is_streamed or
+                'Content-Encoding' in response.headers or
+                response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            encoding = 'br'
+            compressed = brotli.compress(body, quality=brotli_quality)
+        elif accepted['gzip']:
+            encoding = 'gzip'
+            compressed = gzip.compress(body, compresslevel=gzip_level)
+        else:
+            response.vary.add('Accept-Encoding')
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        if response.get_etag()[0]:
+            # A strong ETag must change with the content-coding
+            etag, weak = response.get_etag()
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
+
+    return compress_response
@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadLog:
+    """Append-only, line-oriented log of certificate download events.
+
+    Events are buffered and written to ``downloads.log`` in groups, one JSON
+    object per line. The active file is rotated by size or age into
+    timestamped segments, and a checkpoint holding consumer summaries is
+    written on each rotation so startup only replays the active segment.
+    Raw history stays on disk and is read lazily through ``iter_events``.
+    """
+
+    ACTIVE_NAME = 'downloads.log'
+    SEGMENT_PREFIX = 'downloads-'
+    CHECKPOINT_NAME = 'downloads.checkpoint.json'
+
+    def __init__(self, log_dir, max_bytes=10 * 1024 * 1024, rotate_interval=86400,
+                 flush_events=50, flush_interval=2.0, recent_size=1000, fsync=False):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self.active_path = os.path.join(log_dir, self.ACTIVE_NAME)
+        self.checkpoint_path = os.path.join(log_dir, self.CHECKPOINT_NAME)
+
+        self._lock = threading.RLock()
+        self._buffer = []
+        self._recent = deque(maxlen=recent_size)
+        self._consumers = {}
+        self._last_flush = time.monotonic()
+        self._opened_at = None
+        self._flusher = None
+        self._closed = False
+
+        os.makedirs(log_dir, exist_ok=True)
+
+    def register(self, name, on_event, snapshot=None, restore=None):
+        """Register a consumer that is fed every event, live and on replay.
+
+        Consumers that provide ``snapshot``/``restore`` are persisted in the
+        checkpoint; others are rebuilt by replaying all segments at load.
+        """
+        self._consumers[name] = {'on_event': on_event, 'snapshot': snapshot, 'restore': restore}
+
+    def load(self):
+        """Restore consumers from the checkpoint and replay newer events"""
+        checkpoint = self._read_checkpoint()
+        covered = set(checkpoint.get('segments', []))
+        states = checkpoint.get('consumers', {})
+
+        restored, full_replay = [], []
+        for name, consumer in self._consumers.items():
+            if consumer['restore'] is not None and name in states:
+                consumer['restore'](states[name])
+                restored.append(consumer)
+            else:
+                full_replay.append(consumer)
+
+        replayed = 0
+        for segment in self._segment_paths() + [self.active_path]:
+            targets = full_replay if os.path.basename(segment) in covered else restored + full_replay
+            if not targets:
+                continue
+            for event in self._read_file(segment):
+                for consumer in targets:
+                    consumer['on_event'](event)
+                self._recent.append(event)
+                replayed += 1
+
+        self._opened_at = self._active_opened_at()
+        logger.info(f"✅ Download log loaded: {replayed} events replayed from {self.log_dir}")
+        return replayed
+
+    def start(self):
+        """Start the background thread that flushes idle buffers"""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='download-log-flusher', daemon=True)
+            self._flusher.start()
+
+    def append(self, event):
+        """Record one download event and feed it to all consumers"""
+        with self._lock:
+            self._buffer.append(json.dumps(event, default=str) + '\n')
+            self._recent.append(event)
+            for consumer in self._consumers.values():
+                consumer['on_event'](event)
+
+            if (len(self._buffer) >= self.flush_events or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+
+    def flush(self):
+        """Write buffered events to disk"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flush pending events and stop the background flusher"""
+        with self._lock:
+            self._flush()
+            self._closed = True
+
+    def pending(self):
+        """Number of buffered events not yet written to disk"""
+        with self._lock:
+            return len(self._buffer)
+
+    def recent(self, limit=None):
+        """Return the most recent events kept in memory, oldest first"""
+        with self._lock:
+            events = list(self._recent)
+        return events[-limit:] if limit else events
+
+    def iter_events(self):
+        """Yield every logged event in order, streaming from disk"""
+        with self._lock:
+            self._flush()
+        for segment in self._segment_paths() + [self.active_path]:
+            yield from self._read_file(segment)
+
+    def _flush(self):
+        if self._buffer:
+            try:
+                with open(self.active_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(self._buffer))
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                # Keep the buffer so the next flush retries the write
+                logger.error(f"❌ Error writing download log: {e}")
+                return
+            self._buffer = []
+            if self._opened_at is None:
+                self._opened_at = time.time()
+        self._last_flush = time.monotonic()
+        self._maybe_rotate()
+
+    def _maybe_rotate(self):
+        try:
+            size = os.path.getsize(self.active_path)
+        except OSError:
+            return
+        if size == 0:
+            return
+
+        age = time.time() - (self._opened_at or time.time())
+        if size < self.max_bytes and age < self.rotate_interval:
+            return
+
+        segment_name = f"{self.SEGMENT_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.log"
+        os.replace(self.active_path, os.path.join(self.log_dir, segment_name))
+        self._opened_at = None
+        self._write_checkpoint()
+        logger.info(f"✅ Download log rotated to {segment_name}")
+
+    def _write_checkpoint(self):
+        checkpoint = {
+            'created_at': datetime.now().isoformat(),
+            'segments': [os.path.basename(path) for path in self._segment_paths()],
+            'consumers': {
+                name: consumer['snapshot']()
+                for name, consumer in self._consumers.items()
+                if consumer['snapshot'] is not None
+            }
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, default=str)
+            os.replace(tmp_path, self.checkpoint_path)
+        except OSError as e:
+            logger.error(f"❌ Error writing download log checkpoint: {e}")
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Ignoring unreadable download log checkpoint: {e}")
+            return {}
+
+    def _segment_paths(self):
+        names = sorted(
+            name for name in os.listdir(self.log_dir)
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith('.log')
+        )
+        return [os.path.join(self.log_dir, name) for name in names]
+
+    def _active_opened_at(self):
+        for event in self._read_file(self.active_path):
+            try:
+                return datetime.fromisoformat(event['download_time']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                break
+        return None
+
+    def _flush_loop(self):
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Download log flush error: {e}")
+
+    @staticmethod
+    def _read_file(path):
+        try:
+            f = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
@@ -0,0 +1,100 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+
+class DownloadMetrics:
+    """Per-batch download counts rolled up into minute, hour and day buckets.
+
+    Every download is counted once at each resolution, so coarser buckets
+    are the downsampled form of finer ones and stay available after the
+    finer buckets expire. Each resolution has its own retention window.
+    """
+
+    RESOLUTIONS = ('minute', 'hour', 'day')
+
+    def __init__(self, minute_retention=timedelta(hours=48), hour_retention=timedelta(days=90),
+                 day_retention=timedelta(days=730)):
+        self.retention = {
+            'minute': minute_retention,
+            'hour': hour_retention,
+            'day': day_retention
+        }
+        self._lock = threading.Lock()
+        self._buckets = {resolution: {} for resolution in self.RESOLUTIONS}
+
+    @staticmethod
+    def bucket_start(moment, resolution):
+        """Truncate a datetime to the start of its bucket"""
+        if resolution == 'minute':
+            return moment.replace(second=0, microsecond=0)
+        if resolution == 'hour':
+            return moment.replace(minute=0, second=0, microsecond=0)
+        if resolution == 'day':
+            return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    def record(self, event):
+        """Count one download event in every resolution"""
+        try:
+            moment = datetime.fromisoformat(event['download_time'])
+        except (KeyError, TypeError, ValueError):
+            return
+        batch_number = event.get('batch_number')
+
+        with self._lock:
+            for resolution in self.RESOLUTIONS:
+                buckets = self._buckets[resolution]
+                key = self.bucket_start(moment, resolution)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = Counter()
+                    self._prune(resolution)
+                bucket[batch_number] += 1
+
+    def query(self, resolution, start, end, batch_number=None):
+        """Return buckets with start <= bucket < end, oldest first"""
+        if resolution not in self.RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        first = self.bucket_start(start, resolution)
+        with self._lock:
+            rows = []
+            for key in sorted(k for k in self._buckets[resolution] if first <= k < end):
+                bucket = self._buckets[resolution][key]
+                if batch_number is not None:
+                    batches = {batch_number: bucket[batch_number]} if batch_number in bucket else {}
+                else:
+                    batches = dict(bucket)
+                if batches:
+                    rows.append({
+                        'start': key.isoformat(),
+                        'downloads': sum(batches.values()),
+                        'batches': batches
+                    })
+        return rows
+
+    def snapshot(self):
+        """Serializable state for the download log checkpoint"""
+        with self._lock:
+            return {
+                resolution: {key.isoformat(): dict(bucket) for key, bucket in buckets.items()}
+                for resolution, buckets in self._buckets.items()
+            }
+
+    def restore(self, state):
+        """Load state previously produced by ``snapshot``"""
+        with self._lock:
+            for resolution in self.RESOLUTIONS:
+                self._buckets[resolution] = {
+                    datetime.fromisoformat(key): Counter(bucket)
+                    for key, bucket in sorted(state.get(resolution, {}).items())
+                }
+                self._prune(resolution)
+
+    def _prune(self, resolution):
+        cutoff = datetime.now() - self.retention[resolution]
+        buckets = self._buckets[resolution]
+        expired = [key for key in buckets if key < cutoff]
+        for key in expired:
+            del buckets[key]
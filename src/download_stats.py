@@ -0,0 +1,78 @@
+import threading
+from itertools import islice
+
+
+class DownloadStats:
+    """Download counters and per-student aggregates updated per event.
+
+    Each logged download costs O(1); reports read the running totals
+    instead of walking the download history.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_downloads = 0
+        self._students = {}  # sixerclass_id -> aggregate, in first-download order
+
+    def record(self, event):
+        """Fold one download event into the counters"""
+        sid = event['sixerclass_id']
+        download_time = event['download_time']
+        with self._lock:
+            self.total_downloads += 1
+            entry = self._students.get(sid)
+            if entry is None:
+                self._students[sid] = {
+                    'student_name': event['student_name'],
+                    'sixerclass_id': sid,
+                    'batch_number': event['batch_number'],
+                    'download_count': 1,
+                    'first_download': download_time,
+                    'last_download': download_time
+                }
+                return
+
+            entry['download_count'] += 1
+            entry['student_name'] = event['student_name']
+            entry['batch_number'] = event['batch_number']
+            if download_time < entry['first_download']:
+                entry['first_download'] = download_time
+            if download_time > entry['last_download']:
+                entry['last_download'] = download_time
+
+    def summary(self):
+        """Return the headline totals"""
+        with self._lock:
+            total = self.total_downloads
+            unique = len(self._students)
+        return {
+            'total_downloads': total,
+            'unique_students': unique,
+            'avg_downloads': round(total / unique, 1) if unique > 0 else 0
+        }
+
+    def get(self, sixerclass_id):
+        """Return a copy of one student's aggregate, or None"""
+        with self._lock:
+            entry = self._students.get(sixerclass_id)
+            return dict(entry) if entry else None
+
+    def students(self, offset=0, limit=None):
+        """Return a page of per-student aggregates"""
+        with self._lock:
+            stop = None if limit is None else offset + limit
+            return [dict(entry) for entry in islice(self._students.values(), offset, stop)]
+
+    def snapshot(self):
+        """Serializable state for the download log checkpoint"""
+        with self._lock:
+            return {
+                'total_downloads': self.total_downloads,
+                'students': [dict(entry) for entry in self._students.values()]
+            }
+
+    def restore(self, state):
+        """Load state previously produced by ``snapshot``"""
+        with self._lock:
+            self.total_downloads = state.get('total_downloads', 0)
+            self._students = {entry['sixerclass_id']: dict(entry) for entry in state.get('students', [])}
@@ -0,0 +1,74 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+
+
+class ExportCache:
+    """LRU cache of rendered export bodies, bounded by total bytes.
+
+    Keys carry the roster/log data versions the export was built from, so a
+    cached body is valid until the data changes and never needs explicit
+    invalidation; stale versions simply age out of the LRU.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        # Versions restart with the process, so ETags are scoped to this instance
+        self._instance = uuid.uuid4().hex
+
+    def etag(self, key):
+        """Strong ETag for the export identified by ``key``"""
+        return hashlib.sha1(f"{self._instance}:{key!r}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def tee(self, key, chunks):
+        """Pass chunks through and cache the full body once it completes"""
+        parts, size = [], 0
+        for chunk in chunks:
+            if parts is not None:
+                size += len(chunk)
+                if size > self.max_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+            yield chunk
+        if parts is not None:
+            self.put(key, b''.join(parts))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
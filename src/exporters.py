@@ -0,0 +1,205 @@
+import csv
+import io
+import tempfile
+
+from flask import Response, request, stream_with_context
+
+from compression import encoded_etags
+
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+# Accept header media types mapped to export formats, in preference order
+ACCEPT_FORMATS = {
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'text/csv': 'csv',
+    'application/vnd.apache.parquet': 'parquet',
+    'application/x-parquet': 'parquet'
+}
+
+PARQUET_BATCH_ROWS = 50000
+
+
+def parquet_available():
+    """Parquet support is optional and needs pyarrow installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def negotiate_export_format(default='xlsx'):
+    """Pick the export format from ?format= or else the Accept header"""
+    requested = request.args.get('format')
+    if requested:
+        return requested.lower()
+    best = request.accept_mimetypes.best_match(list(ACCEPT_FORMATS))
+    return ACCEPT_FORMATS.get(best, default)
+
+
+def iter_csv(headers, rows, chunk_size=CHUNK_SIZE):
+    """Yield CSV bytes for the header and rows in chunks of ~chunk_size"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_xlsx(headers, rows, sheet_title='Sheet1', chunk_size=CHUNK_SIZE):
+    """Yield XLSX bytes built with openpyxl's write-only mode.
+
+    A zip archive cannot be emitted until it is complete, so the workbook is
+    assembled in a spooled temporary file (in memory for small exports, an
+    anonymous temp file for large ones) and then streamed out in chunks.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_parquet(headers, rows, chunk_size=CHUNK_SIZE, batch_rows=PARQUET_BATCH_ROWS):
+    """Yield Parquet bytes, writing one row group per batch of rows.
+
+    Like XLSX, the file footer is only known at the end, so the file is
+    assembled in a spooled temporary file before being streamed. Column types
+    are inferred from the first batch; when a later batch does not fit (e.g.
+    an ID column that turns from numbers to text), the affected columns are
+    widened to strings and the row groups written so far are rewritten.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        writer = None
+        schema = None
+        batch = []
+
+        def write_batch():
+            nonlocal writer, schema
+            columns = list(zip(*batch)) if batch else [[] for _ in headers]
+            if schema is None:
+                fields = []
+                for name, values in zip(headers, columns):
+                    field_type = _arrow_array(pa, values).type
+                    fields.append(pa.field(name, pa.string() if pa.types.is_null(field_type) else field_type))
+                schema = pa.schema(fields)
+                writer = pq.ParquetWriter(spool, schema)
+
+            arrays = [_arrow_array(pa, values, field.type) for values, field in zip(columns, schema)]
+            if any(array.type != field.type for array, field in zip(arrays, schema)):
+                # Rare: rewrite what is written so far with the widened schema
+                schema = pa.schema([
+                    field if array.type == field.type else pa.field(field.name, pa.string())
+                    for array, field in zip(arrays, schema)
+                ])
+                writer.close()
+                writer = None
+                spool.seek(0)
+                written = pq.read_table(spool).cast(schema)
+                spool.seek(0)
+                spool.truncate()
+                writer = pq.ParquetWriter(spool, schema)
+                if written.num_rows:
+                    writer.write_table(written)
+                arrays = [_arrow_array(pa, values, field.type) for values, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    write_batch()
+                    batch = []
+            if batch or writer is None:
+                write_batch()
+        finally:
+            if writer is not None:
+                writer.close()
+
+        spool.seek(0)
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _arrow_array(pa, values, field_type=None):
+    # Columns with mixed Python types (e.g. numeric IDs read from Excel) fall back to strings
+    try:
+        return pa.array(values, type=field_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def export_response(headers, rows, basename, export_format='xlsx', cache=None, cache_key=None):
+    """Build a chunked attachment response for tabular export rows.
+
+    When a cache is given, ``cache_key`` must identify the data version the
+    rows come from; the response then carries an ETag, ``If-None-Match``
+    hits return 304 and repeated downloads are served from the cache.
+    ``rows`` may be a callable so nothing is generated on a cache hit.
+    """
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'xlsx'
+    response_headers = {'Content-Disposition': f'attachment; filename={basename}.{export_format}'}
+
+    if cache is not None:
+        cache_key = (cache_key, export_format)
+        etag = cache.etag(cache_key)
+        # Cached bodies may have gone out compressed, under an encoded ETag
+        for tag in encoded_etags(etag):
+            if tag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(tag)
+                return response
+
+        body = cache.get(cache_key)
+        if body is None:
+            body = stream_with_context(cache.tee(cache_key, _iter_export(headers, rows, export_format)))
+        response = Response(body, content_type=EXPORT_FORMATS[export_format], headers=response_headers)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return Response(
+        stream_with_context(_iter_export(headers, rows, export_format)),
+        content_type=EXPORT_FORMATS[export_format],
+        headers=response_headers
+    )
+
+
+def _iter_export(headers, rows, export_format):
+    if callable(rows):
+        rows = rows()
+    if export_format == 'csv':
+        return iter_csv(headers, rows)
+    if export_format == 'parquet':
+        return iter_parquet(headers, rows)
+    return iter_xlsx(headers, rows)
@@ -0,0 +1,42 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's encoder is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson.
+
+    Keys are sorted and separators compact like the default provider, and
+    dates go through the same ``default`` hook (HTTP date strings), so the
+    decoded output is the same except that NaN/Infinity become null. The
+    bytes differ: non-ASCII text is written as raw UTF-8 rather than
+    ``\\uXXXX`` escapes. ``loads`` is left to the default provider so request
+    parsing is unchanged.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return self._dump_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+    def _dump_bytes(self, obj):
+        # Dates are serialized by Flask's default hook, as without orjson
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def init_json_provider(app, enabled=True):
+    """Install the orjson provider when it is enabled and installed"""
+    if enabled and orjson is not None:
+        app.json = OrjsonProvider(app)
+        return True
+    return False
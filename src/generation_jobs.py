@@ -0,0 +1,160 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from admission import GenerationOverloaded
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('done', 'failed')
+
+# Per-process generator for the process pool, built on first use
+_process_generator = None
+
+
+def render_in_process(template_dir, student, filepath):
+    """Process-pool entry point: render with a generator local to the worker"""
+    global _process_generator
+    if _process_generator is None:
+        from certificate_generator import CertificateGenerator
+        _process_generator = CertificateGenerator(template_dir)
+    return _process_generator.create_certificate(student, filepath)
+
+
+class GenerationJobs:
+    """Background certificate generation with pollable job status.
+
+    ``submit`` returns immediately with a job that a thread or process pool
+    renders later. Jobs are deduplicated by key while queued or running (a
+    duplicate submit adds its owner and success callback to the existing
+    job), the number of unfinished jobs is bounded, and finished jobs are kept for
+    ``job_ttl`` seconds so clients can collect the result.
+    """
+
+    def __init__(self, workers, max_pending, job_ttl=600, use_processes=False):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.use_processes = use_processes
+        if use_processes:
+            self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix='certificate-job')
+        self._cond = threading.Condition()
+        self._jobs = {}     # job_id -> job dict
+        self._futures = {}  # job_id -> Future
+        self._by_key = {}   # key -> job_id of the unfinished job
+        self._callbacks = {}  # job_id -> on_success callbacks of every submitter
+
+    def submit(self, key, owner, result, fn, *args, on_success=None):
+        """Queue ``fn(*args)``; return the job, reusing an unfinished one for ``key``"""
+        with self._cond:
+            self._prune()
+            job_id = self._by_key.get(key)
+            if job_id is not None:
+                self._jobs[job_id]['owners'].add(owner)
+                if on_success is not None:
+                    self._callbacks[job_id].append(on_success)
+                return self._view(job_id)
+
+            pending = sum(1 for job in self._jobs.values() if job['status'] not in FINISHED_STATUSES)
+            if pending >= self.max_pending:
+                raise GenerationOverloaded("Generation job queue is full", max(1.0, pending / self.workers))
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'owners': {owner},
+                'created_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'finished': None,
+                'result': result,
+                'error': None
+            }
+            self._by_key[key] = job_id
+            self._callbacks[job_id] = [on_success] if on_success is not None else []
+            future = self._executor.submit(fn, *args)
+            self._futures[job_id] = future
+
+        future.add_done_callback(lambda f: self._finish(job_id, key, f))
+        return self.get(job_id)
+
+    def _finish(self, job_id, key, future):
+        try:
+            success = future.result()
+            error = None if success else "Certificate generation failed"
+        except GenerationOverloaded:
+            success, error = False, "Certificate service is busy. Please try again shortly."
+        except Exception as e:
+            success, error = False, f"Certificate generation failed: {e}"
+
+        # Stop deduplicating onto this job before running its callbacks, so
+        # no submitter's callback is added after they have run
+        with self._cond:
+            if self._by_key.get(key) == job_id:
+                del self._by_key[key]
+            callbacks = self._callbacks.pop(job_id, [])
+        if success:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"❌ Job {job_id} success callback failed: {e}")
+
+        with self._cond:
+            job = self._jobs[job_id]
+            job['status'] = 'done' if success else 'failed'
+            job['error'] = error
+            job['finished_at'] = datetime.now().isoformat()
+            job['finished'] = time.monotonic()
+            self._futures.pop(job_id, None)
+            self._cond.notify_all()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job['finished'] and job['finished'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _view(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        view = {k: v for k, v in job.items() if k != 'finished'}
+        view['owners'] = set(job['owners'])
+        future = self._futures.get(job_id)
+        if view['status'] == 'queued' and future is not None and future.running():
+            view['status'] = 'running'
+        if view['status'] != 'done':
+            view['result'] = None
+        return view
+
+    def get(self, job_id):
+        """Public view of a job, or None when unknown or expired"""
+        with self._cond:
+            return self._view(job_id)
+
+    def wait(self, job_id, seen_status, timeout):
+        """Block until the job leaves ``seen_status`` or ``timeout`` elapses"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: (self._view(job_id) or {}).get('status') != seen_status,
+                timeout
+            )
+            return self._view(job_id)
+
+    def stats(self):
+        """Job counts by status"""
+        with self._cond:
+            counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+            for job_id in self._jobs:
+                counts[self._view(job_id)['status']] += 1
+            return counts
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
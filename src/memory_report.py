@@ -0,0 +1,166 @@
+import gc
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from collections import Counter, deque
+
+from metrics import process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def deep_size(obj, max_objects=1_000_000):
+    """Approximate bytes held by ``obj`` and the containers/strings it references"""
+    seen = set()
+    pending = deque([obj])
+    total = 0
+    while pending and len(seen) < max_objects:
+        current = pending.popleft()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            pending.extend(current)
+        elif hasattr(current, '__dict__') and not isinstance(current, type):
+            pending.append(vars(current))
+    return total
+
+
+def type_counts(limit=25):
+    """Most common live object types tracked by the garbage collector"""
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return [{'type': name, 'count': count} for name, count in counts.most_common(limit)]
+
+
+class MemoryTracker:
+    """tracemalloc snapshots on demand.
+
+    Tracing costs memory and CPU, so it only runs between ``start`` and
+    ``stop`` (or from startup when asked). ``mark`` stores a baseline that
+    later reports are diffed against to find what is growing.
+    """
+
+    def __init__(self, frames=10):
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._baseline = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+        tracemalloc.stop()
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def mark(self):
+        """Start tracing if needed and take the baseline snapshot"""
+        self.start()
+        snapshot = self._snapshot()
+        with self._lock:
+            self._baseline = snapshot
+
+    def report(self, limit=20, key_type='lineno'):
+        """Top allocators, plus growth since the baseline when one exists"""
+        if not tracemalloc.is_tracing():
+            return {'tracing': False}
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        result = {
+            'tracing': True,
+            'traced_bytes': current,
+            'peak_traced_bytes': peak,
+            'top': [
+                {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics(key_type)[:limit]
+            ]
+        }
+        with self._lock:
+            baseline = self._baseline
+        if baseline is not None:
+            result['diff'] = [
+                {
+                    'location': str(stat.traceback),
+                    'size_bytes': stat.size,
+                    'size_diff_bytes': stat.size_diff,
+                    'count_diff': stat.count_diff
+                }
+                for stat in snapshot.compare_to(baseline, key_type)[:limit]
+            ]
+        return result
+
+
+class RSSWatchdog:
+    """Warns when RSS crosses ``warn_bytes`` and acts at ``limit_bytes``.
+
+    At the limit it logs an error and, with ``recycle`` enabled, sends the
+    process SIGTERM so a process manager (gunicorn's arbiter, systemd, ECS)
+    replaces it gracefully before the kernel OOM killer intervenes.
+    """
+
+    def __init__(self, warn_bytes, limit_bytes=0, interval=30, recycle=False):
+        self.warn_bytes = warn_bytes
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.recycle = recycle
+        self.last_rss = 0
+        self._warned = False
+        self._recycling = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not (self.warn_bytes or self.limit_bytes) or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='rss-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Sample RSS once and warn/recycle as configured"""
+        rss = self.last_rss = process_rss_bytes()
+        mb = rss / (1024 * 1024)
+        if self.limit_bytes and rss >= self.limit_bytes and not self._recycling:
+            if self.recycle:
+                self._recycling = True
+                logger.error(f"❌ RSS {mb:.0f} MB over limit, recycling worker {os.getpid()}")
+                os.kill(os.getpid(), signal.SIGTERM)
+            else:
+                logger.error(f"❌ RSS {mb:.0f} MB over limit of {self.limit_bytes / (1024 * 1024):.0f} MB")
+        elif self.warn_bytes and rss >= self.warn_bytes:
+            if not self._warned:
+                self._warned = True
+                logger.warning(f"⚠️ RSS {mb:.0f} MB over warning threshold")
+        else:
+            self._warned = False
+        return rss
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"❌ RSS watchdog error: {e}")
@@ -0,0 +1,301 @@
+import json
+import logging
+import math
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds, from cache hits to slow renders
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    parts = []
+    for name, value in key:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def process_rss_bytes():
+    """Current resident set size, falling back to peak RSS off Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self):
+        """Snapshot as {label_key: value}"""
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Gauge; ``multiprocess_mode`` is 'liveall' (pid label) or 'livesum'"""
+    type = 'gauge'
+
+    def __init__(self, name, documentation, multiprocess_mode='liveall'):
+        super().__init__(name, documentation)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        # Find the bucket outside the lock; only the increments are locked
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            return {key: [list(state[0]), state[1], state[2]] for key, state in self._values.items()}
+
+
+class _Callback:
+    """A counter or gauge whose samples are read from ``fn`` at collection time"""
+
+    def __init__(self, name, documentation, metric_type, fn, multiprocess_mode='liveall'):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.fn = fn
+        self.multiprocess_mode = multiprocess_mode
+
+    def samples(self):
+        values = self.fn()
+        if not isinstance(values, dict):
+            return {(): values}
+        return {_label_key(labels if isinstance(labels, dict) else dict(labels)): value
+                for labels, value in values.items()}
+
+
+class MetricsRegistry:
+    """Process metrics rendered in the Prometheus text exposition format.
+
+    Without ``multiprocess_dir`` only this process is reported. With it, each
+    process periodically writes its samples to ``<dir>/<pid>.json`` and
+    ``render`` merges every file: counters and histograms are summed across
+    all processes that ever wrote one (so they never go backwards), gauges
+    only across live processes. The directory should be emptied when the
+    server (re)starts.
+    """
+
+    def __init__(self, multiprocess_dir=None, flush_interval=5.0):
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+        if multiprocess_dir:
+            os.makedirs(multiprocess_dir, exist_ok=True)
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation):
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name, documentation, multiprocess_mode='liveall'):
+        return self._register(Gauge(name, documentation, multiprocess_mode))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, buckets))
+
+    def callback(self, name, documentation, metric_type, fn, multiprocess_mode='liveall'):
+        """Register a counter/gauge computed by ``fn()`` -> value or {labels: value}"""
+        return self._register(_Callback(name, documentation, metric_type, fn, multiprocess_mode))
+
+    def _snapshot(self):
+        snapshot = {}
+        for name, metric in list(self._metrics.items()):
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.error(f"❌ Metric {name} collection failed: {e}")
+                continue
+            snapshot[name] = {
+                'type': metric.type,
+                'help': metric.documentation,
+                'buckets': list(getattr(metric, 'buckets', ()))[:-1],
+                'mode': getattr(metric, 'multiprocess_mode', None),
+                'samples': [[list(map(list, key)), value] for key, value in samples.items()]
+            }
+        return snapshot
+
+    def start(self):
+        """Begin writing this process's samples for the other workers to read"""
+        if not self.multiprocess_dir or self._flusher is not None:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        self._flusher.start()
+
+    def flush(self):
+        if not self.multiprocess_dir:
+            return
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'pid': os.getpid(), 'metrics': self._snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except OSError as e:
+            logger.error(f"❌ Metrics flush failed: {e}")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"❌ Metrics flush failed: {e}")
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def _process_snapshots(self):
+        """(pid, snapshot, alive) for this process and every other writer"""
+        own_pid = os.getpid()
+        yield own_pid, self._snapshot(), True
+        if not self.multiprocess_dir:
+            return
+        for name in os.listdir(self.multiprocess_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get('pid') == own_pid:
+                continue
+            yield data['pid'], data['metrics'], self._alive(data['pid'])
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        merged = {}  # name -> {'type', 'help', 'buckets', 'samples': {key: value}}
+        for pid, snapshot, alive in self._process_snapshots():
+            for name, metric in snapshot.items():
+                entry = merged.setdefault(name, {
+                    'type': metric['type'], 'help': metric['help'],
+                    'buckets': metric['buckets'], 'samples': {}
+                })
+                if metric['type'] == 'gauge' and not alive:
+                    continue
+                for key, value in metric['samples']:
+                    key = tuple(tuple(pair) for pair in key)
+                    if metric['type'] == 'gauge' and metric['mode'] == 'liveall' and self.multiprocess_dir:
+                        key = key + (('pid', str(pid)),)
+                    self._merge(entry, key, value)
+
+        lines = []
+        for name in sorted(merged):
+            entry = merged[name]
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            for key in sorted(entry['samples']):
+                value = entry['samples'][key]
+                if entry['type'] != 'histogram':
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(entry['buckets'] + [math.inf], counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(key + (('le', _format_value(bound)),))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _merge(entry, key, value):
+        existing = entry['samples'].get(key)
+        if existing is None:
+            entry['samples'][key] = value if entry['type'] != 'histogram' else [list(value[0]), value[1], value[2]]
+        elif entry['type'] == 'histogram':
+            existing[0] = [a + b for a, b in zip(existing[0], value[0])]
+            existing[1] += value[1]
+            existing[2] += value[2]
+        else:
+            entry['samples'][key] = existing + value
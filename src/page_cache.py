@@ -0,0 +1,60 @@
+import gzip
+import hashlib
+import textwrap
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class PrecompiledPage:
+    """An HTML page rendered once at startup with precompressed variants.
+
+    Each request only negotiates ``Accept-Encoding`` and ``If-None-Match``
+    against bytes that already exist, so serving the page costs no
+    templating or compression work.
+    """
+
+    def __init__(self, html, cache_control='no-cache', content_type='text/html; charset=utf-8'):
+        body = (textwrap.dedent(html).strip() + '\n').encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.cache_control = cache_control
+        self.content_type = content_type
+        # Strong ETags must differ per content-coding of the representation
+        self.variants = {'identity': (body, digest)}
+        self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f"{digest}-gz")
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f"{digest}-br")
+        self._etags = {etag for _, etag in self.variants.values()}
+        self.served = 0
+        self.not_modified = 0
+
+    def _negotiate(self):
+        accepted = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self):
+        """Serve the page, answering 304 when the client copy is current"""
+        encoding = self._negotiate()
+        body, etag = self.variants[encoding]
+
+        if any(tag in request.if_none_match for tag in self._etags):
+            self.not_modified += 1
+            response = Response(status=304)
+        else:
+            self.served += 1
+            response = Response(body, content_type=self.content_type)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = self.cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,193 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+
+class MemorySessionStore:
+    """Per-process session store; suitable for a single worker process"""
+
+    def __init__(self, prune_interval=60):
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._sessions = {}  # sid -> (expires, data)
+        self._last_prune = time.monotonic()
+
+    def get(self, sid):
+        """Return (data, expires) for a live session, or None"""
+        with self._lock:
+            entry = self._sessions.get(sid)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1], entry[0]
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._sessions[sid] = (time.time() + ttl, data)
+        self._maybe_prune()
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def _maybe_prune(self):
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = time.monotonic()
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (expires, _) in self._sessions.items() if expires <= now]
+            for sid in expired:
+                del self._sessions[sid]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """SQLite-backed session store shared by all worker processes on a host"""
+
+    def __init__(self, path, prune_interval=60):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._last_prune = 0.0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        """Return (data, expires) for a live session, or None"""
+        row = self._connection().execute(
+            "SELECT data, expires FROM sessions WHERE sid = ? AND expires > ?", (sid, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, sid, data, ttl):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)",
+                (sid, json.dumps(data), time.time() + ttl)
+            )
+        self._maybe_prune()
+
+    def delete(self, sid):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def _maybe_prune(self):
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = time.monotonic()
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session data held server side; the cookie only carries a signed ID"""
+
+    def __init__(self, initial=None, sid=None, new=False, refresh=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.refresh = refresh
+        self.modified = False
+        self.stale_sid = None
+
+    def regenerate(self):
+        """Move the data to a fresh session ID; call on every privilege change
+        so a session ID planted before login cannot ride the login"""
+        if not self.new:
+            self.stale_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface storing session data in a session store.
+
+    Sessions expire ``ttl`` seconds after their last write; an active session
+    is re-saved once less than half of its TTL remains, so reads stay cheap.
+    """
+
+    salt = 'server-side-session'
+
+    def __init__(self, store, ttl=3600):
+        self.store = store
+        self.ttl = ttl
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            entry = self.store.get(sid) if sid else None
+            if entry is not None:
+                data, expires = entry
+                return ServerSession(data, sid, refresh=expires - time.time() < self.ttl / 2)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.stale_sid:
+            self.store.delete(session.stale_sid)
+            session.stale_sid = None
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified or session.refresh:
+            self.store.set(session.sid, dict(session), self.ttl)
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid).decode(),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+                domain=domain,
+                path=path
+            )
+        response.vary.add('Cookie')
@@ -0,0 +1,102 @@
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Heavy dependencies that should only load during warm-up or on first use
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'reportlab', 'PIL')
+
+
+class StartupReport:
+    """Cold-start timing and background warm-up.
+
+    Module-level import and init code calls ``checkpoint`` after each step,
+    which records the time since the previous checkpoint. Slow steps that
+    requests can wait for (roster loading, heavy library imports) are
+    registered with ``defer`` and run by ``warm_up``, normally on a
+    background thread; ``ready`` is set once every deferred step has run.
+    Each step also records which of ``watch_modules`` it imported, so a
+    heavy import creeping back onto the import path shows up in the report.
+    """
+
+    def __init__(self, watch_modules=HEAVY_MODULES):
+        self.started = time.perf_counter()
+        self.watch_modules = watch_modules
+        self.steps = []
+        self.ready_event = threading.Event()
+        self.ready_seconds = None
+        self.import_seconds = None
+        self._deferred = []
+        self._last = self.started
+        self._loaded = self._watched_loaded()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.ready_event.is_set()
+
+    def _watched_loaded(self):
+        return {name for name in self.watch_modules if name in sys.modules}
+
+    def _record(self, name, phase, seconds, error=None):
+        loaded = self._watched_loaded()
+        step = {
+            'name': name,
+            'phase': phase,
+            'ms': round(seconds * 1000, 1),
+            'loaded_modules': sorted(loaded - self._loaded)
+        }
+        if error is not None:
+            step['error'] = str(error)
+        self._loaded = loaded
+        self.steps.append(step)
+
+    def checkpoint(self, name, phase='init'):
+        """Record the time since the previous checkpoint as step ``name``"""
+        now = time.perf_counter()
+        self._record(name, phase, now - self._last)
+        self._last = now
+
+    def defer(self, name, fn):
+        """Run ``fn`` during warm-up instead of at import time"""
+        self._deferred.append((name, fn))
+
+    def warm_up(self, background=True):
+        """Run the deferred steps, on a daemon thread unless ``background`` is false"""
+        self.import_seconds = time.perf_counter() - self.started
+        if not background:
+            self._run()
+            return
+        self._thread = threading.Thread(target=self._run, name='startup-warmup', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until warm-up finishes; returns False on timeout"""
+        return self.ready_event.wait(timeout)
+
+    def _run(self):
+        for name, fn in self._deferred:
+            started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                # A failed step is reported but does not keep the app unready
+                logger.error(f"❌ Warm-up step '{name}' failed: {e}")
+                self._record(name, 'warmup', time.perf_counter() - started, error=e)
+            else:
+                self._record(name, 'warmup', time.perf_counter() - started)
+
+        self.ready_seconds = time.perf_counter() - self.started
+        self.ready_event.set()
+        summary = ', '.join(f"{step['name']} {step['ms']:.0f} ms" for step in self.steps)
+        logger.info(f"✅ Ready in {self.ready_seconds:.2f}s (import {self.import_seconds:.2f}s): {summary}")
+
+    def report(self):
+        return {
+            'ready': self.ready,
+            'import_seconds': round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            'ready_seconds': round(self.ready_seconds, 3) if self.ready_seconds is not None else None,
+            'steps': list(self.steps)
+        }
@@ -0,0 +1,173 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    def __init__(self, name, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.error = False
+
+    def start_span(self, name, parent_id=None, **attributes):
+        span = {
+            'span_id': uuid.uuid4().hex[:16],
+            'parent_id': parent_id,
+            'name': name,
+            'start_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'duration_ms': None,
+            'attributes': attributes
+        }
+        self.spans.append(span)
+        return span
+
+    def end_span(self, span, error=None):
+        span['duration_ms'] = round((time.perf_counter() - self.start) * 1000 - span['start_ms'], 3)
+        if error is not None:
+            span['attributes']['error'] = repr(error)
+            self.error = True
+
+    def duration_ms(self):
+        return round((time.perf_counter() - self.start) * 1000, 3)
+
+
+def current_trace_id():
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the block as a child of the current span; a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    record = trace.start_span(name, parent['span_id'] if parent else None, **attributes)
+    token = _current_span.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        trace.end_span(record, error=e)
+        raise
+    else:
+        trace.end_span(record)
+    finally:
+        _current_span.reset(token)
+
+
+def record_error(error):
+    """Mark the current span and its trace as failed for an error that was handled"""
+    trace = _current_trace.get()
+    current = _current_span.get()
+    if trace is None or current is None:
+        return
+    current['attributes']['error'] = repr(error) if isinstance(error, BaseException) else str(error)
+    trace.error = True
+
+
+class TraceLogFilter(logging.Filter):
+    """Adds ``trace_id`` to log records so log lines correlate with traces"""
+
+    def filter(self, record):
+        record.trace_id = current_trace_id() or '-'
+        return True
+
+
+class Tracer:
+    """Per-request traces exported as JSON lines.
+
+    Every request is traced (spans are a few dict writes), and the decision
+    to export is made when the request ends: a ``sample_rate`` fraction of
+    traces plus every trace that errored or took at least ``slow_ms`` is
+    appended to ``path``, one JSON object per line. Traces that rendered a
+    certificate are expected to take longer and use ``render_slow_ms``
+    instead. Once ``path`` reaches ``max_bytes`` it is rotated to ``path.1``,
+    keeping ``backups`` old files.
+    """
+
+    def __init__(self, path, sample_rate=0.01, slow_ms=1000, render_slow_ms=5000,
+                 max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.render_slow_ms = render_slow_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.exported = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def begin(self, name, trace_id=None, **attributes):
+        """Start a trace with a root span and make it current"""
+        trace = Trace(name, trace_id)
+        root = trace.start_span(name, **attributes)
+        trace.tokens = (_current_trace.set(trace), _current_span.set(root))
+        trace.root = root
+        return trace
+
+    def detach(self, trace):
+        """Stop treating ``trace`` as current, leaving its root span open"""
+        trace_token, span_token = trace.tokens
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+    def end(self, trace, **attributes):
+        """Close the root span and export the trace if it is sampled"""
+        trace.root['attributes'].update(attributes)
+        trace.end_span(trace.root)
+        duration_ms = trace.duration_ms()
+        rendered = any(span['name'] == 'render' for span in trace.spans)
+        slow_ms = self.render_slow_ms if rendered else self.slow_ms
+        if not (trace.error or duration_ms >= slow_ms or random.random() < self.sample_rate):
+            return False
+
+        record = {
+            'trace_id': trace.trace_id,
+            'name': trace.name,
+            'started_at': trace.started_at,
+            'duration_ms': duration_ms,
+            'spans': trace.spans
+        }
+        try:
+            line = json.dumps(record, default=str) + '\n'
+            with self._lock:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    size = f.tell()
+                self.exported += 1
+                if size >= self.max_bytes:
+                    self._rotate()
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"❌ Trace export failed: {e}")
+            return False
+        return True
+
+    def _rotate(self):
+        # traces.jsonl -> traces.jsonl.1 -> ... -> traces.jsonl.<backups>, oldest dropped
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)